@@ -0,0 +1,97 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from uuid import uuid4
+
+from backend.revocation import revoked_tokens
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+class UserCache:
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._rows = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                return None
+            if row[0] < time.monotonic():
+                del self._rows[key]
+                return None
+            self._rows.move_to_end(key)
+            return row[1]
+
+    def set(self, key, values):
+        with self._lock:
+            self._rows[key] = (time.monotonic() + self.ttl, values)
+            self._rows.move_to_end(key)
+            while len(self._rows) > self.size:
+                self._rows.popitem(last=False)
+
+    def discard(self, user_id):
+        with self._lock:
+            for key in [key for key in self._rows
+                        if key[0] == str(user_id)]:
+                del self._rows[key]
+
+
+user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE,
+                       settings.AUTH_USER_CACHE_TTL)
+
+
+def version_key(user_id):
+    return f'auth:version:{user_id}'
+
+
+def auth_version(user_id):
+    version = cache.get(version_key(user_id))
+    if version is None:
+        cache.add(version_key(user_id), uuid4().hex, None)
+        version = cache.get(version_key(user_id))
+    return version
+
+
+def forget_user(user_id):
+    def bump():
+        cache.set(version_key(user_id), uuid4().hex, None)
+        user_cache.discard(user_id)
+    transaction.on_commit(bump)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        jti = token.get(api_settings.JTI_CLAIM)
+        if jti and revoked_tokens.is_revoked(jti):
+            raise InvalidToken('Токен отозван.')
+        return token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        key = (str(user_id), auth_version(user_id))
+        values = user_cache.get(key)
+        model = get_user_model()
+        fields = [f.attname for f in model._meta.concrete_fields]
+        if values is None:
+            user = super().get_user(validated_token)
+            user_cache.set(key, [getattr(user, f) for f in fields])
+            return user
+        return model.from_db('default', fields, [
+            copy.deepcopy(v) if isinstance(v, (dict, list)) else v
+            for v in values
+        ])
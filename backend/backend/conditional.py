@@ -0,0 +1,51 @@
+from hashlib import sha1
+
+from backend.viewer import VIEWER_RELATIONS
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    return quote_etag(sha1(repr(parts).encode()).hexdigest())
+
+
+def viewer_state(user):
+    if not user.is_authenticated:
+        return None
+    stats = {}
+    for name in VIEWER_RELATIONS:
+        relation = user._meta.get_field(name)
+        rows = relation.related_model.objects.filter(
+            **{relation.field.name: OuterRef('pk')}
+        ).order_by().values(relation.field.name)
+        stats[f'{name}_count'] = Subquery(
+            rows.annotate(value=Count('id')).values('value'))
+        stats[f'{name}_last'] = Subquery(
+            rows.annotate(value=Max('id')).values('value'))
+    return type(user).objects.filter(pk=user.pk).annotate(
+        **stats
+    ).values_list(*stats).first()
+
+
+class ConditionalGetMixin:
+
+    def get_validators(self, request, *args, **kwargs):
+        return None, None
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request, *args, **kwargs)
+        if last_modified:
+            last_modified = int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            if etag:
+                response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ['Authorization'])
+        return response
@@ -2,3 +2,6 @@ MIN_INT = 1
 MAX_INT = 32000
 MB_SIZE = 1048576
 MAX_IMAGE_SIZE = 5
+IMAGE_QUALITY = 82
+RECIPE_IMAGE_VARIANTS = {'card': 480, 'thumbnail': 160}
+AVATAR_IMAGE_VARIANTS = {'avatar': 96}
@@ -0,0 +1,15 @@
+from backend.authentication import forget_user
+from backend.response_cache import bump_generation
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+
+def bump_counter(model, pk, field, delta):
+    rows = model.objects.filter(pk=pk)
+    if delta < 0:
+        rows = rows.filter(**{f'{field}__gte': -delta})
+    rows.update(**{field: F(field) + delta, 'updated_at': timezone.now()})
+    bump_generation(model)
+    if model._meta.label == settings.AUTH_USER_MODEL:
+        forget_user(pk)
@@ -0,0 +1,87 @@
+import base64
+import binascii
+import uuid
+
+import filetype
+from backend.constants import MAX_IMAGE_SIZE, MB_SIZE
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from drf_extra_fields.fields import Base64ImageField
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import ImageField
+
+
+class DecodedUpload(TemporaryUploadedFile):
+
+    def __del__(self):
+        self.close()
+
+
+class StreamingImageField(Base64ImageField):
+    chunk_size = 64 * 1024
+    too_large_message = f"Максимальный размер изображения {MAX_IMAGE_SIZE}Мб."
+
+    def __init__(self, *args, max_size=MAX_IMAGE_SIZE * MB_SIZE, **kwargs):
+        self.max_size = max_size
+        super().__init__(*args, **kwargs)
+
+    def to_internal_value(self, data):
+        if data in self.EMPTY_VALUES:
+            return None
+        if isinstance(data, str):
+            data = self.decode_to_file(data)
+        elif getattr(data, 'size', 0) > self.max_size:
+            raise ValidationError(self.too_large_message)
+        return ImageField.to_internal_value(self, data)
+
+    def decode_to_file(self, data):
+        header_end = data.find(';base64,')
+        start = header_end + len(';base64,') if header_end >= 0 else 0
+        end = len(data)
+        while end > start and data[end - 1].isspace():
+            end -= 1
+        encoded_size = (end - start - data.count('\n', start, end)
+                        - data.count('\r', start, end))
+        if encoded_size // 4 * 3 > self.max_size + 2:
+            raise ValidationError(self.too_large_message)
+        content_type = None
+        if self.trust_provided_content_type and header_end >= 0:
+            content_type = data[:header_end].replace('data:', '')
+        upload = DecodedUpload('upload', content_type, 0, None)
+        rest = ''
+        try:
+            for pos in range(start, end, self.chunk_size):
+                chunk = rest + ''.join(
+                    data[pos:min(pos + self.chunk_size, end)].split()
+                )
+                cut = len(chunk) // 4 * 4
+                upload.write(base64.b64decode(chunk[:cut], validate=True))
+                rest = chunk[cut:]
+            if rest:
+                raise binascii.Error
+        except (binascii.Error, ValueError):
+            upload.close()
+            raise ValidationError(self.INVALID_FILE_MESSAGE)
+        upload.size = upload.tell()
+        if upload.size > self.max_size:
+            upload.close()
+            raise ValidationError(self.too_large_message)
+        upload.name = f'{uuid.uuid4()}.{self.get_upload_extension(upload)}'
+        upload.seek(0)
+        return upload
+
+    def get_upload_extension(self, upload):
+        upload.seek(0)
+        extension = filetype.guess_extension(upload.read(261))
+        if extension is None:
+            try:
+                with Image.open(upload.temporary_file_path()) as image:
+                    extension = image.format.lower()
+            except OSError:
+                upload.close()
+                raise ValidationError(self.INVALID_FILE_MESSAGE)
+        extension = 'jpg' if extension == 'jpeg' else extension
+        if extension not in self.ALLOWED_TYPES:
+            upload.close()
+            raise ValidationError(self.INVALID_TYPE_MESSAGE)
+        return extension
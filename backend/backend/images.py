@@ -0,0 +1,96 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from backend.authentication import forget_user
+from backend.constants import IMAGE_QUALITY
+from backend.response_cache import bump_generation
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.utils import timezone
+from PIL import Image
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_WORKERS,
+    thread_name_prefix='images',
+)
+
+
+def variant_urls(request, image, variants, names):
+    if not image:
+        return None
+    original = image.url
+    ready = variants if variants.get('source') == image.name else {}
+    urls = {'original': original}
+    for name in names:
+        path = ready.get(name)
+        urls[name] = image.storage.url(path) if path else original
+    if request:
+        urls = {k: request.build_absolute_uri(v) for k, v in urls.items()}
+    return urls
+
+
+def delete_variants(storage, variants):
+    for name, path in variants.items():
+        if name != 'source':
+            storage.delete(path)
+
+
+def discard_variants(instance, field):
+    storage = instance._meta.get_field(field).storage
+    variants = getattr(instance, f'{field}_variants')
+    if variants:
+        transaction.on_commit(lambda: delete_variants(storage, variants))
+
+
+def schedule_variants(instance, field, sizes):
+    image = getattr(instance, field)
+    variants = getattr(instance, f'{field}_variants')
+    if not image or variants.get('source') == image.name:
+        return
+    transaction.on_commit(lambda: executor.submit(
+        build_variants, instance._meta.label, instance.pk, field,
+        image.name, sizes,
+    ))
+
+
+def build_variants(model_label, pk, field, name, sizes):
+    model = apps.get_model(model_label)
+    storage = model._meta.get_field(field).storage
+    stem = os.path.splitext(name)[0]
+    variants = {'source': name}
+    try:
+        with storage.open(name) as f, Image.open(f) as original:
+            original = original.convert('RGB')
+            for variant, size in sizes.items():
+                picture = original.copy()
+                picture.thumbnail((size, size), Image.LANCZOS)
+                content = BytesIO()
+                picture.save(content, 'JPEG', quality=IMAGE_QUALITY,
+                             optimize=True, progressive=True)
+                variants[variant] = storage.save(
+                    f'{stem}_{variant}.jpg', ContentFile(content.getvalue())
+                )
+        rows = model.objects.filter(pk=pk, **{field: name})
+        with transaction.atomic():
+            previous = rows.select_for_update().values_list(
+                f'{field}_variants', flat=True
+            ).first()
+            updated = previous is not None and rows.update(**{
+                f'{field}_variants': variants, 'updated_at': timezone.now()
+            })
+        if not updated:
+            delete_variants(storage, variants)
+        else:
+            delete_variants(storage, {
+                variant: path for variant, path in previous.items()
+                if path not in variants.values()
+            })
+            bump_generation(model)
+            if model_label == settings.AUTH_USER_MODEL:
+                forget_user(pk)
+    finally:
+        connection.close()
+    return variants
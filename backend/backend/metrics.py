@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from functools import partial
+
+from django.db import connections
+from django.http import HttpResponse
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Histogram, generate_latest,
+                               multiprocess)
+
+LATENCY_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+request_seconds = Histogram(
+    'foodgram_request_seconds', 'Время обработки запроса.',
+    ['view', 'method', 'status'], buckets=LATENCY_BUCKETS,
+)
+db_queries = Histogram(
+    'foodgram_db_queries', 'Число SQL-запросов на запрос.',
+    ['view', 'method'], buckets=COUNT_BUCKETS,
+)
+db_seconds = Histogram(
+    'foodgram_db_seconds', 'Время SQL-запросов на запрос.',
+    ['view', 'method'], buckets=LATENCY_BUCKETS,
+)
+serializer_seconds = Histogram(
+    'foodgram_serializer_seconds', 'Время сериализации ответа.',
+    ['view', 'method'], buckets=LATENCY_BUCKETS,
+)
+response_bytes = Histogram(
+    'foodgram_response_bytes', 'Размер ответа.',
+    ['view', 'method'], buckets=SIZE_BUCKETS,
+)
+
+local = threading.local()
+
+
+class Sample:
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serializer = 0.0
+        self.depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - start
+            self.queries += 1
+
+
+class TimedSerializerMixin:
+
+    def to_representation(self, instance):
+        sample = getattr(local, 'sample', None)
+        if sample is None:
+            return super().to_representation(instance)
+        sample.depth += 1
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            sample.depth -= 1
+            if not sample.depth:
+                sample.serializer += time.perf_counter() - start
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    view = getattr(match.func, 'view_class', None)
+    return view.__name__ if view else match.view_name
+
+
+@contextmanager
+def sampled(sample):
+    local.sample = sample
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(sample))
+            yield
+    finally:
+        local.sample = None
+
+
+def streamed(content, sample, observe):
+    size = 0
+    try:
+        with sampled(sample):
+            for chunk in content:
+                size += len(chunk)
+                yield chunk
+    finally:
+        observe(size)
+
+
+class MetricsMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == '/metrics':
+            return self.get_response(request)
+        sample = Sample()
+        start = time.perf_counter()
+        with sampled(sample):
+            response = self.get_response(request)
+        observe = partial(self.observe, request, response, sample, start)
+        if response.streaming:
+            response.streaming_content = streamed(
+                response.streaming_content, sample, observe
+            )
+        else:
+            observe(len(response.content))
+        return response
+
+    def observe(self, request, response, sample, start, size):
+        labels = (view_name(request), request.method)
+        request_seconds.labels(*labels, response.status_code).observe(
+            time.perf_counter() - start
+        )
+        db_queries.labels(*labels).observe(sample.queries)
+        db_seconds.labels(*labels).observe(sample.db)
+        serializer_seconds.labels(*labels).observe(sample.serializer)
+        response_bytes.labels(*labels).observe(size)
+
+
+def metrics_view(request):
+    registry = REGISTRY
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(generate_latest(registry),
+                        content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,94 @@
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model, hashers
+from django.contrib.auth.backends import ModelBackend
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix='passwords',
+)
+
+
+class ConcurrencyLimit:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = Counter()
+
+    @contextmanager
+    def hold(self, limits):
+        with self._lock:
+            if any(self._active[key] >= limit for key, limit in limits):
+                raise Throttled(
+                    detail='Слишком много одновременных попыток, '
+                           'повторите позже.'
+                )
+            for key, _ in limits:
+                self._active[key] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                for key, _ in limits:
+                    self._active[key] -= 1
+                    if not self._active[key]:
+                        del self._active[key]
+
+
+concurrency = ConcurrencyLimit()
+
+
+def run(request, account, function, *args):
+    limits = [
+        ('total', settings.PASSWORD_HASH_QUEUE),
+        (f'account:{str(account).casefold()}',
+         settings.LOGIN_CONCURRENCY_PER_ACCOUNT),
+    ]
+    if request is not None:
+        limits.append((f'ip:{BaseThrottle().get_ident(request)}',
+                       settings.LOGIN_CONCURRENCY_PER_IP))
+    with concurrency.hold(limits):
+        return executor.submit(function, *args).result()
+
+
+class PooledModelBackend(ModelBackend):
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        model = get_user_model()
+        if username is None:
+            username = kwargs.get(model.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = model._default_manager.get_by_natural_key(username)
+        except model.DoesNotExist:
+            run(request, username, hashers.make_password, password)
+            return None
+        is_correct, must_update = run(
+            request, username, hashers.verify_password, password,
+            user.password,
+        )
+        if not is_correct or not self.user_can_authenticate(user):
+            return None
+        if must_update:
+            user.password = run(
+                request, username, hashers.make_password, password
+            )
+            user.save(update_fields=['password'])
+        return user
+
+
+def check_password(request, user, password):
+    return run(
+        request, user.email, hashers.verify_password, password, user.password
+    )[0]
+
+
+def make_password(request, account, password):
+    return run(request, account, hashers.make_password, password)
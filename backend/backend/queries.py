@@ -0,0 +1,11 @@
+import re
+
+
+def fingerprint(sql):
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'"s\d+_x\d+"', '"savepoint"', sql)
+    sql = re.sub(r'-?\b\d+\b', '?', sql)
+    sql = re.sub(r'\((?:\?, )*\?\)', '(...)', sql)
+    sql = re.sub(r'\(\.\.\.\)(?:, \(\.\.\.\))+', '(...)', sql)
+    sql = re.sub(r'%s(?:, %s)+', '%s', sql)
+    return re.sub(r'(?:WHEN \(.*?\) THEN \? )+', 'WHEN ... ', sql)
@@ -0,0 +1,92 @@
+from hashlib import sha1
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from backend.routers import use_primary
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from prometheus_client import Counter
+
+cache_requests = Counter(
+    'foodgram_response_cache', 'Обращения к кешу ответов.',
+    ['view', 'result'],
+)
+
+CACHED_HEADERS = ('ETag', 'Last-Modified', 'Vary')
+
+
+def generation_key(model):
+    return f'generation:{model._meta.label_lower}'
+
+
+def current_generations(models):
+    keys = [generation_key(model) for model in models]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, uuid4().hex, None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def bump_generation(*models):
+    def bump():
+        cache.set_many(
+            {generation_key(model): uuid4().hex for model in models}, None
+        )
+    transaction.on_commit(bump)
+
+
+class CachedResponseMixin:
+
+    def get_response_cache_key(self, request):
+        query = urlencode(sorted(
+            (name, value)
+            for name, values in request.query_params.lists()
+            for value in values if name != '_profile'
+        ))
+        digest = sha1(
+            f'{request.build_absolute_uri(request.path)}?{query}'.encode()
+        ).hexdigest()
+        generations = ':'.join(current_generations(self.cache_models))
+        return (f'response:{request.accepted_renderer.format}:'
+                f'{generations}:{digest}')
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        view = type(self).__name__
+        if cached is None:
+            cache_requests.labels(view, 'miss').inc()
+            self.response_cache_key = key
+            use_primary()
+            return super().get(request, *args, **kwargs)
+        cache_requests.labels(view, 'hit').inc()
+        content, content_type, headers = cached
+        response = HttpResponse(content, content_type=content_type)
+        for header, value in headers.items():
+            response[header] = value
+        response['X-Cache'] = 'HIT'
+        return get_conditional_response(
+            request, etag=headers.get('ETag'), response=response
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        key = getattr(self, 'response_cache_key', None)
+        if key and response.status_code == 200 and not response.streaming:
+            response.render()
+            cache.set(key, (
+                response.content,
+                response['Content-Type'],
+                {h: response[h] for h in CACHED_HEADERS if h in response},
+            ), settings.RESPONSE_CACHE_TTL)
+            response['X-Cache'] = 'MISS'
+        return response
@@ -0,0 +1,144 @@
+import hashlib
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone as dt_timezone
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (BlacklistedToken,
+                                                             OutstandingToken)
+
+
+class BloomFilter:
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2
+        ))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        added = False
+        for position in self.positions(key):
+            mask = 1 << (position & 7)
+            added = added or not self.bits[position >> 3] & mask
+            self.bits[position >> 3] |= mask
+        self.count += added
+
+    def __contains__(self, key):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self.positions(key)
+        )
+
+
+class RevokedTokens:
+    version_key = 'tokens:revoked:version'
+    generation_key = 'tokens:revoked:generation'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._checkpoints = deque()
+        self._version = None
+        self._generation = None
+
+    @classmethod
+    def bump_version(cls, rebuild=False):
+        cache.set(cls.version_key, uuid4().hex, None)
+        if rebuild:
+            cache.set(cls.generation_key, uuid4().hex, None)
+
+    def _since_id(self):
+        horizon = time.monotonic() - settings.REVOKED_TOKENS_LOOKBACK
+        checkpoints = self._checkpoints
+        while len(checkpoints) > 1 and checkpoints[1][0] <= horizon:
+            checkpoints.popleft()
+        return checkpoints[0][1]
+
+    def _load(self, bloom):
+        started = time.monotonic()
+        last_id = since_id = self._since_id()
+        rows = BlacklistedToken.objects.filter(
+            id__gt=since_id, token__expires_at__gt=timezone.now()
+        ).order_by('id').values_list('id', 'token__jti')
+        for last_id, jti in rows.iterator(chunk_size=10000):
+            bloom.add(jti)
+        self._checkpoints.append(
+            (started, max(last_id, self._checkpoints[-1][1]))
+        )
+
+    def refresh(self):
+        state = cache.get_many([self.version_key, self.generation_key])
+        version = state.get(self.version_key)
+        generation = state.get(self.generation_key)
+        bloom = self._filter
+        if (bloom is not None and version == self._version
+                and generation == self._generation):
+            return bloom
+        with self._lock:
+            bloom = self._filter
+            if bloom is None or generation != self._generation:
+                bloom = BloomFilter(
+                    max(settings.REVOKED_TOKENS_CAPACITY,
+                        BlacklistedToken.objects.count() * 2),
+                    settings.REVOKED_TOKENS_ERROR_RATE,
+                )
+                self._checkpoints = deque([(time.monotonic(), 0)])
+            self._load(bloom)
+            if bloom.count > bloom.capacity:
+                self.bump_version(rebuild=True)
+            self._filter = bloom
+            self._version, self._generation = version, generation
+        return bloom
+
+    def is_revoked(self, jti):
+        if jti not in self.refresh():
+            return False
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    def revoke(self, token, user):
+        expires_at = datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+        with transaction.atomic():
+            outstanding, _ = OutstandingToken.objects.get_or_create(
+                jti=token['jti'],
+                defaults={
+                    'token': str(token),
+                    'user': user,
+                    'expires_at': expires_at,
+                },
+            )
+            BlacklistedToken.objects.get_or_create(token=outstanding)
+            transaction.on_commit(self.bump_version)
+
+    def purge(self, batch_size):
+        purged = 0
+        expired = OutstandingToken.objects.filter(
+            expires_at__lte=timezone.now()
+        )
+        while True:
+            ids = list(expired.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            OutstandingToken.objects.filter(id__in=ids).delete()
+            purged += len(ids)
+        if purged:
+            self.bump_version(rebuild=True)
+        return purged
+
+
+revoked_tokens = RevokedTokens()
@@ -0,0 +1,95 @@
+import random
+import threading
+
+from backend.authentication import CachedJWTAuthentication
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+REPLICAS = [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+local = threading.local()
+
+
+def pin_key(user_id):
+    return f'primary:{user_id}'
+
+
+def pin_to_primary(user_id):
+    if REPLICAS:
+        cache.set(pin_key(user_id), True,
+                  settings.REPLICA_PIN_SECONDS)
+
+
+def use_primary():
+    local.replicas = False
+
+
+def request_user_id(request):
+    auth = CachedJWTAuthentication()
+    header = auth.get_header(request)
+    raw = header and auth.get_raw_token(header)
+    if raw:
+        try:
+            return str(auth.get_validated_token(raw)[
+                api_settings.USER_ID_CLAIM
+            ])
+        except (InvalidToken, KeyError):
+            return None
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return str(user.pk)
+    return None
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if (getattr(local, 'replicas', False)
+                and model._meta.app_label in settings.REPLICA_APPS
+                and not connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return random.choice(REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not REPLICAS:
+            return self.get_response(request)
+        request.replica_user_id = request_user_id(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            use_primary()
+        if (request.method not in SAFE_METHODS
+                and request.replica_user_id
+                and response.status_code < 400):
+            pin_to_primary(request.replica_user_id)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not REPLICAS or request.method not in SAFE_METHODS:
+            return None
+        view = getattr(view_func, 'view_class', view_func)
+        user_id = request.replica_user_id
+        local.replicas = (
+            view.__module__.split('.')[0] in settings.REPLICA_APPS
+            and not (user_id and cache.get(pin_key(user_id)))
+        )
+        return None
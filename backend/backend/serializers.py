@@ -0,0 +1,8 @@
+from backend.metrics import TimedSerializerMixin
+from monitoring.middleware import ProfiledSerializerMixin
+from rest_framework import serializers
+
+
+class ModelSerializer(ProfiledSerializerMixin, TimedSerializerMixin,
+                      serializers.ModelSerializer):
+    pass
@@ -15,6 +15,8 @@ from pathlib import Path
 import os
 from datetime import timedelta
 
+from django.core.exceptions import ImproperlyConfigured
+
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -47,14 +49,19 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
     'recipes.apps.RecipesConfig',
+    'monitoring.apps.MonitoringConfig',
 ]
 
 MIDDLEWARE = [
+    'backend.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'backend.routers.ReplicaMiddleware',
+    'monitoring.middleware.ProfilingMiddleware',
+    'monitoring.middleware.SlowQueryMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -91,8 +98,34 @@ DATABASES = {
         'PASSWORD': os.getenv('PG_PASSWORD'),
         'HOST': os.getenv('PG_HOST'),
         'PORT': os.getenv('PG_PORT'),
+        'CONN_MAX_AGE': int(os.getenv('PG_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': os.getenv(
+            'PG_CONN_HEALTH_CHECKS', 'True'
+        ) == 'True',
+        'OPTIONS': {},
     }
 }
+if os.getenv('PG_POOL', 'True') == 'True':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('PG_POOL_MIN_SIZE', 1)),
+        'max_size': int(os.getenv('PG_POOL_MAX_SIZE', 8)),
+        'timeout': float(os.getenv('PG_POOL_TIMEOUT', 10)),
+        'max_idle': float(os.getenv('PG_POOL_MAX_IDLE', 600)),
+        'max_lifetime': float(os.getenv('PG_POOL_MAX_LIFETIME', 3600)),
+    }
+for n, replica in enumerate(
+        filter(None, os.getenv('PG_REPLICA_HOSTS', '').split(','))):
+    host, _, port = replica.strip().partition(':')
+    DATABASES[f'replica{n + 1}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['backend.routers.ReplicaRouter']
+REPLICA_APPS = ('recipes', 'users')
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
 
 
 # Password validation
@@ -100,6 +133,8 @@ DATABASES = {
 
 AUTH_USER_MODEL = 'users.User'
 
+AUTHENTICATION_BACKENDS = ['backend.passwords.PooledModelBackend']
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -115,9 +150,34 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'PBKDF2PasswordHasher')
+INSTALLED_PASSWORD_HASHERS = (
+    'PBKDF2PasswordHasher',
+    'PBKDF2SHA1PasswordHasher',
+    'ScryptPasswordHasher',
+)
+if PASSWORD_HASHER not in INSTALLED_PASSWORD_HASHERS:
+    raise ImproperlyConfigured(
+        f'Неизвестный PASSWORD_HASHER "{PASSWORD_HASHER}", допустимые '
+        f'значения: {", ".join(INSTALLED_PASSWORD_HASHERS)}.'
+    )
+
+PASSWORD_HASHERS = [
+    f'django.contrib.auth.hashers.{hasher}'
+    for hasher in sorted(INSTALLED_PASSWORD_HASHERS,
+                         key=lambda hasher: hasher != PASSWORD_HASHER)
+]
+
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+PASSWORD_HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', 16))
+LOGIN_CONCURRENCY_PER_IP = int(os.getenv('LOGIN_CONCURRENCY_PER_IP', 4))
+LOGIN_CONCURRENCY_PER_ACCOUNT = int(
+    os.getenv('LOGIN_CONCURRENCY_PER_ACCOUNT', 2)
+)
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'backend.authentication.CachedJWTAuthentication',
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
@@ -154,6 +214,52 @@ STATIC_ROOT = BASE_DIR / 'static_data'
 STATIC_URL = 'static_data/'
 MEDIA_ROOT = BASE_DIR / 'media_data'
 MEDIA_URL = '/media_data/'
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', 2))
+AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', 10000))
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 300))
+REVOKED_TOKENS_CAPACITY = int(os.getenv('REVOKED_TOKENS_CAPACITY', 1000000))
+REVOKED_TOKENS_ERROR_RATE = float(os.getenv('REVOKED_TOKENS_ERROR_RATE', 0.001))
+REVOKED_TOKENS_LOOKBACK = int(os.getenv('REVOKED_TOKENS_LOOKBACK', 60))
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', '/tmp/foodgram-cache'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 10000)),
+        },
+    },
+}
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 300))
+CARD_CACHE_TTL = int(os.getenv('CARD_CACHE_TTL', 3600))
+VIEWER_SETS_TTL = int(os.getenv('VIEWER_SETS_TTL', 3600))
+PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', 200))
+PROFILE_REPORT_LINES = int(os.getenv('PROFILE_REPORT_LINES', 80))
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+SLOW_QUERY_QUEUE = int(os.getenv('SLOW_QUERY_QUEUE', 100))
+SLOW_QUERY_SAMPLES = int(os.getenv('SLOW_QUERY_SAMPLES', 20))
+SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', BASE_DIR / 'slow_queries.log')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.handlers.WatchedFileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'monitoring.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
 
 
 # Default primary key field type
@@ -17,11 +17,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 from django.urls import include
+from backend.metrics import metrics_view
 from recipes.views import IngredientListView, IngredientView
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view),
     path('api/users/', include('users.urls')),
     path('api/auth/', include('users.urls')),
     path('api/recipes/', include('recipes.urls')),
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VIEWER_RELATIONS = {
+    'fav_u': 'recipe_id',
+    'basket_u': 'recipe_id',
+    'follower': 'following_id',
+}
+
+
+def viewer_key(user_id, relation):
+    return f'viewer:{user_id}:{relation}'
+
+
+def viewer_sets(user, state=None):
+    keys = {name: viewer_key(user.id, name) for name in VIEWER_RELATIONS}
+    cached = cache.get_many(keys.values())
+    sets, fresh = {}, {}
+    for n, (name, key) in enumerate(keys.items()):
+        stamp = tuple(state[2 * n:2 * n + 2]) if state else None
+        ids, cached_stamp = cached.get(key, (None, None))
+        if ids is None or (stamp is not None and stamp != cached_stamp):
+            ids = frozenset(getattr(user, name).values_list(
+                VIEWER_RELATIONS[name], flat=True
+            ))
+            fresh[key] = (ids, stamp)
+        sets[name] = ids
+    if fresh:
+        cache.set_many(fresh, settings.VIEWER_SETS_TTL)
+    return sets
+
+
+def forget_viewer(user_id, *relations):
+    keys = [viewer_key(user_id, name) for name in relations]
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,13 @@
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    from django.db import connections
+
+    for connection in connections.all(initialized_only=True):
+        if connection.alias in getattr(connection, '_connection_pools', {}):
+            connection.close_pool()
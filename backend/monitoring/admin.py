@@ -0,0 +1,112 @@
+import json
+
+from django.contrib import admin
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from .models import RequestProfile, SlowQuery, SlowQueryGroup
+
+
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'method', 'path', 'status', 'duration_ms',
+                    'query_count', 'query_ms', 'user')
+    list_filter = ('method', 'status')
+    search_fields = ('path',)
+    fields = ('created_at', 'user', 'method', 'path', 'status',
+              'duration_ms', 'query_count', 'query_ms', 'download',
+              'duplicates_table', 'fields_table', 'report_text',
+              'queries_table')
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path('<int:profile_id>/download/',
+                 self.admin_site.admin_view(self.download_view),
+                 name='monitoring_requestprofile_download'),
+        ] + super().get_urls()
+
+    def download_view(self, request, profile_id):
+        profile = get_object_or_404(RequestProfile, id=profile_id)
+        response = HttpResponse(bytes(profile.stats),
+                                content_type='application/octet-stream')
+        response['Content-Disposition'] = (
+            f'attachment; filename="profile-{profile.id}.prof"'
+        )
+        return response
+
+    @admin.display(description='Файл pstats')
+    def download(self, obj):
+        return format_html('<a href="{}">profile-{}.prof</a>', reverse(
+            'admin:monitoring_requestprofile_download', args=[obj.id]
+        ), obj.id)
+
+    @admin.display(description='Повторяющиеся запросы')
+    def duplicates_table(self, obj):
+        return self.pre(obj.duplicates)
+
+    @admin.display(description='Время полей сериализаторов')
+    def fields_table(self, obj):
+        return self.pre(obj.serializer_fields)
+
+    @admin.display(description='Профиль cProfile')
+    def report_text(self, obj):
+        return format_html('<pre>{}</pre>', obj.report)
+
+    @admin.display(description='SQL-запросы')
+    def queries_table(self, obj):
+        return self.pre(obj.queries)
+
+    def pre(self, value):
+        return format_html(
+            '<pre>{}</pre>', json.dumps(value, ensure_ascii=False, indent=2)
+        )
+
+
+admin.site.register(RequestProfile, RequestProfileAdmin)
+
+
+class SlowQueryInline(admin.StackedInline):
+    model = SlowQuery
+    extra = 0
+    can_delete = False
+    fields = ('created_at', 'duration_ms', 'view', 'frame', 'sql', 'params',
+              'plan_text')
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='План EXPLAIN')
+    def plan_text(self, obj):
+        return format_html('<pre>{}</pre>', obj.plan)
+
+
+class SlowQueryGroupAdmin(admin.ModelAdmin):
+    list_display = ('short_fingerprint', 'calls', 'total_ms', 'average_ms',
+                    'max_ms', 'last_seen')
+    search_fields = ('fingerprint', 'samples__view')
+    fields = ('fingerprint', 'calls', 'total_ms', 'max_ms', 'last_seen')
+    readonly_fields = fields
+    inlines = (SlowQueryInline,)
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.display(description='Нормализованный SQL')
+    def short_fingerprint(self, obj):
+        return obj.fingerprint[:150]
+
+    @admin.display(description='Среднее время, мс')
+    def average_ms(self, obj):
+        return round(obj.total_ms / obj.calls, 3) if obj.calls else 0
+
+
+admin.site.register(SlowQueryGroup, SlowQueryGroupAdmin)
@@ -0,0 +1,213 @@
+import cProfile
+import io
+import marshal
+import pstats
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from functools import partial
+
+from backend.authentication import CachedJWTAuthentication
+from backend.metrics import view_name
+from backend.queries import fingerprint
+from django.conf import settings
+from django.db import connections
+from django.urls import reverse
+from rest_framework.exceptions import APIException
+
+from .models import RequestProfile
+from .slow_queries import SlowQueryWrapper
+
+local = threading.local()
+
+
+class Capture:
+
+    def __init__(self):
+        self.queries = []
+        self.fields = defaultdict(lambda: [0, 0.0])
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'params': repr(params)[:500],
+                'ms': round((time.perf_counter() - start) * 1000, 3),
+            })
+
+    def duplicates(self):
+        groups = defaultdict(lambda: {'count': 0, 'ms': 0.0, 'same': set()})
+        for query in self.queries:
+            group = groups[fingerprint(query['sql'])]
+            group['count'] += 1
+            group['ms'] += query['ms']
+            group['same'].add((query['sql'], query['params']))
+        return sorted((
+            {'sql': sql, 'count': group['count'],
+             'identical': group['count'] - len(group['same']),
+             'ms': round(group['ms'], 3)}
+            for sql, group in groups.items() if group['count'] > 1
+        ), key=lambda group: -group['count'])
+
+
+def timed_field(method, timing, calls=0):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            timing[0] += calls
+            timing[1] += time.perf_counter() - start
+    return wrapper
+
+
+class ProfiledSerializerMixin:
+
+    def get_fields(self):
+        fields = super().get_fields()
+        capture = getattr(local, 'capture', None)
+        if capture is None:
+            return fields
+        name = type(self).__name__
+        for field_name, field in fields.items():
+            if field.write_only:
+                continue
+            timing = capture.fields[f'{name}.{field_name}']
+            field.get_attribute = timed_field(field.get_attribute, timing, 1)
+            field.to_representation = timed_field(
+                field.to_representation, timing
+            )
+        return fields
+
+
+def profiling_user(request):
+    if (request.headers.get('X-Profile') != '1'
+            and request.GET.get('_profile') != '1'):
+        return None
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            user = (CachedJWTAuthentication().authenticate(request)
+                    or (None,))[0]
+        except APIException:
+            return None
+    return user if user is not None and user.is_staff else None
+
+
+@contextmanager
+def profiling(capture, profiler):
+    local.capture = capture
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(capture))
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+    finally:
+        local.capture = None
+
+
+def profiled(content, capture, profiler, finish):
+    try:
+        with profiling(capture, profiler):
+            yield from content
+    finally:
+        finish()
+
+
+class ProfilingMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user = profiling_user(request)
+        if user is None:
+            return self.get_response(request)
+        capture = Capture()
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        with profiling(capture, profiler):
+            response = self.get_response(request)
+        profile = RequestProfile(
+            user=user,
+            method=request.method,
+            path=request.get_full_path(),
+            status=response.status_code,
+            duration_ms=0,
+            query_count=0,
+            query_ms=0,
+            stats=b'',
+        )
+        finish = partial(self.save, profile, start, capture, profiler)
+        if response.streaming:
+            profile.save()
+            response.streaming_content = profiled(
+                response.streaming_content, capture, profiler, finish
+            )
+        else:
+            finish()
+        response['X-Profile-Id'] = profile.id
+        response['X-Profile-Url'] = reverse(
+            'admin:monitoring_requestprofile_change', args=[profile.id]
+        )
+        return response
+
+    def save(self, profile, start, capture, profiler):
+        profile.duration_ms = round((time.perf_counter() - start) * 1000, 3)
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats(
+            'cumulative'
+        ).print_stats(settings.PROFILE_REPORT_LINES)
+        profiler.create_stats()
+        profile.query_count = len(capture.queries)
+        profile.query_ms = round(sum(q['ms'] for q in capture.queries), 3)
+        profile.queries = capture.queries
+        profile.duplicates = capture.duplicates()
+        profile.serializer_fields = sorted((
+            {'field': field, 'calls': calls, 'ms': round(seconds * 1000, 3)}
+            for field, (calls, seconds) in capture.fields.items()
+        ), key=lambda field: -field['ms'])
+        profile.report = report.getvalue()
+        profile.stats = marshal.dumps(profiler.stats)
+        profile.save()
+        stale = RequestProfile.objects.values_list(
+            'id', flat=True
+        )[settings.PROFILE_KEEP:]
+        RequestProfile.objects.filter(id__in=list(stale)).delete()
+
+
+def watched(request):
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(SlowQueryWrapper(
+            lambda: view_name(request), connection.alias
+        )))
+    return stack
+
+
+def streamed(content, request):
+    with watched(request):
+        yield from content
+
+
+class SlowQueryMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with watched(request):
+            response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = streamed(
+                response.streaming_content, request
+            )
+        return response
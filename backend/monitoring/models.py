@@ -0,0 +1,162 @@
+from django.db import models
+from users.models import User
+
+
+class RequestProfile(models.Model):
+    class Meta:
+        ordering = ['-id']
+        verbose_name = 'Профиль запроса'
+        verbose_name_plural = 'Профили запросов'
+
+    def __str__(self):
+        return f'{self.method} {self.path}'
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создан'
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='request_profiles',
+        verbose_name='Пользователь'
+    )
+
+    method = models.CharField(
+        max_length=10,
+        verbose_name='Метод'
+    )
+
+    path = models.TextField(
+        verbose_name='Адрес'
+    )
+
+    status = models.PositiveSmallIntegerField(
+        verbose_name='Код ответа'
+    )
+
+    duration_ms = models.FloatField(
+        verbose_name='Длительность, мс'
+    )
+
+    query_count = models.PositiveIntegerField(
+        verbose_name='Число SQL-запросов'
+    )
+
+    query_ms = models.FloatField(
+        verbose_name='Время SQL, мс'
+    )
+
+    queries = models.JSONField(
+        default=list,
+        verbose_name='SQL-запросы'
+    )
+
+    duplicates = models.JSONField(
+        default=list,
+        verbose_name='Повторяющиеся запросы'
+    )
+
+    serializer_fields = models.JSONField(
+        default=list,
+        verbose_name='Время полей сериализаторов'
+    )
+
+    report = models.TextField(
+        verbose_name='Профиль cProfile'
+    )
+
+    stats = models.BinaryField(
+        verbose_name='Данные pstats'
+    )
+
+
+class SlowQueryGroup(models.Model):
+    class Meta:
+        ordering = ['-total_ms']
+        verbose_name = 'Медленный запрос'
+        verbose_name_plural = 'Медленные запросы'
+
+    def __str__(self):
+        return self.fingerprint[:80]
+
+    digest = models.CharField(
+        max_length=40,
+        unique=True,
+        verbose_name='Хеш отпечатка'
+    )
+
+    fingerprint = models.TextField(
+        verbose_name='Нормализованный SQL'
+    )
+
+    calls = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число вызовов'
+    )
+
+    total_ms = models.FloatField(
+        default=0,
+        verbose_name='Общее время, мс'
+    )
+
+    max_ms = models.FloatField(
+        default=0,
+        verbose_name='Максимальное время, мс'
+    )
+
+    last_seen = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Последний раз'
+    )
+
+
+class SlowQuery(models.Model):
+    class Meta:
+        ordering = ['-id']
+        verbose_name = 'Пример медленного запроса'
+        verbose_name_plural = 'Примеры медленных запросов'
+
+    def __str__(self):
+        return f'{self.view}: {self.duration_ms} мс'
+
+    group = models.ForeignKey(
+        SlowQueryGroup,
+        on_delete=models.CASCADE,
+        related_name='samples',
+        verbose_name='Группа'
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создан'
+    )
+
+    sql = models.TextField(
+        verbose_name='SQL'
+    )
+
+    params = models.TextField(
+        verbose_name='Параметры'
+    )
+
+    duration_ms = models.FloatField(
+        verbose_name='Длительность, мс'
+    )
+
+    view = models.CharField(
+        max_length=200,
+        verbose_name='Представление'
+    )
+
+    frame = models.CharField(
+        max_length=500,
+        verbose_name='Место вызова'
+    )
+
+    plan = models.TextField(
+        blank=True,
+        verbose_name='План EXPLAIN'
+    )
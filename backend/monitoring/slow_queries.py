@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha1
+
+from backend.queries import fingerprint
+from django.conf import settings
+from django.db import connections
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import SlowQuery, SlowQueryGroup
+
+logger = logging.getLogger('monitoring.slow_queries')
+
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='explain')
+pending = threading.BoundedSemaphore(settings.SLOW_QUERY_QUEUE)
+
+SKIPPED_FILES = (
+    os.path.dirname(__file__),
+    os.path.join(settings.BASE_DIR, 'backend', 'metrics.py'),
+)
+
+
+def calling_frame():
+    for frame in reversed(traceback.extract_stack()):
+        if (frame.filename.startswith(str(settings.BASE_DIR))
+                and 'site-packages' not in frame.filename
+                and not frame.filename.startswith(SKIPPED_FILES)):
+            path = os.path.relpath(frame.filename, settings.BASE_DIR)
+            return f'{path}:{frame.lineno} in {frame.name}'
+    return ''
+
+
+class SlowQueryWrapper:
+
+    def __init__(self, view, alias):
+        self.view = view
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            if (duration >= settings.SLOW_QUERY_MS
+                    and pending.acquire(blocking=False)):
+                entry = {
+                    'sql': sql,
+                    'params': params,
+                    'many': many,
+                    'duration_ms': round(duration, 3),
+                    'view': self.view(),
+                    'frame': calling_frame(),
+                }
+                executor.submit(record, self.alias, entry)
+
+
+def explain(alias, sql, params, many):
+    if many or not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return ''
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'{connection.ops.explain_query_prefix()} {sql}', params
+        )
+        return '\n'.join(
+            row[0] if len(row) == 1 else ' '.join(map(str, row))
+            for row in cursor.fetchall()
+        )
+
+
+def record(alias, entry):
+    many = entry.pop('many')
+    try:
+        try:
+            entry['plan'] = explain(alias, entry['sql'], entry['params'],
+                                    many)
+        except Exception as error:
+            entry['plan'] = f'EXPLAIN не выполнен: {error}'
+        entry['params'] = repr(entry['params'])[:2000]
+        entry['fingerprint'] = fingerprint(entry['sql'])
+        logger.warning(json.dumps(entry, ensure_ascii=False))
+        digest = sha1(entry['fingerprint'].encode()).hexdigest()
+        group, _ = SlowQueryGroup.objects.get_or_create(
+            digest=digest, defaults={'fingerprint': entry['fingerprint']}
+        )
+        SlowQueryGroup.objects.filter(id=group.id).update(
+            calls=F('calls') + 1,
+            total_ms=F('total_ms') + entry['duration_ms'],
+            max_ms=Greatest(F('max_ms'), entry['duration_ms']),
+            last_seen=timezone.now(),
+        )
+        SlowQuery.objects.create(
+            group=group,
+            sql=entry['sql'],
+            params=entry['params'],
+            duration_ms=entry['duration_ms'],
+            view=entry['view'],
+            frame=entry['frame'],
+            plan=entry['plan'],
+        )
+        stale = SlowQuery.objects.filter(group=group).values_list(
+            'id', flat=True
+        )[settings.SLOW_QUERY_SAMPLES:]
+        SlowQuery.objects.filter(id__in=list(stale)).delete()
+    except Exception:
+        logger.exception('Не удалось сохранить медленный запрос')
+    finally:
+        pending.release()
+        connections.close_all()
@@ -1,20 +1,11 @@
 from django.contrib import admin
-from django.db.models import Count
 from .models import *
 
 
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ('id', 'name', 'author', 'f_count')
+    list_display = ('id', 'name', 'author', 'favorites_count')
     search_fields = ('name', 'author__username', 'author__email')
-
-    def get_queryset(self, request):
-        rows = super().get_queryset(request)
-        return rows.annotate(
-            _f_count=Count('fav_r', distinct=True)
-        )
-
-    def f_count(self, obj):
-        return obj._f_count
+    readonly_fields = ('favorites_count',)
 
 
 class IngredientAdmin(admin.ModelAdmin):
@@ -27,4 +18,5 @@ admin.site.register(Ingredient, IngredientAdmin)
 admin.site.register(IRLinkModel)
 admin.site.register(FavRecipe)
 admin.site.register(Basket)
+admin.site.register(BasketIngredient)
 
@@ -0,0 +1,103 @@
+from collections import Counter
+
+from django.contrib.auth.hashers import make_password
+
+from recipes import shopping_list
+from recipes.catalog import IngredientCatalog
+from recipes.models import Basket, FavRecipe, Ingredient, IRLinkModel, Recipe
+from users.models import Follow, User
+
+PASSWORD = 'Foodgram-2025'
+
+
+def make_users(count, prefix='user', password=PASSWORD):
+    password = make_password(password)
+    return User.objects.bulk_create([
+        User(
+            email=f'{prefix}{i}@example.com',
+            username=f'{prefix}{i}',
+            first_name='Имя',
+            last_name='Фамилия',
+            password=password,
+        )
+        for i in range(count)
+    ])
+
+
+def make_ingredients(count, prefix='ingredient'):
+    return Ingredient.objects.bulk_create([
+        Ingredient(name=f'{prefix}{i}', measurement_unit='г')
+        for i in range(count)
+    ])
+
+
+def make_recipes(authors, ingredients, per_author=1, amount=10):
+    recipes = Recipe.objects.bulk_create([
+        Recipe(
+            author=author,
+            name=f'{author.username} {i}',
+            image='recipes/sample.png',
+            text='Описание',
+            cooking_time=30,
+        )
+        for author in authors
+        for i in range(per_author)
+    ])
+    IRLinkModel.objects.bulk_create([
+        IRLinkModel(recipe=recipe, ingredient=ingredient, amount=amount)
+        for recipe in recipes
+        for ingredient in ingredients
+    ])
+    return recipes
+
+
+def make_favorites(user, recipes):
+    return FavRecipe.objects.bulk_create([
+        FavRecipe(user=user, recipe=recipe) for recipe in recipes
+    ])
+
+
+def make_baskets(user, recipes):
+    baskets = Basket.objects.bulk_create([
+        Basket(user=user, recipe=recipe) for recipe in recipes
+    ])
+    amounts, counts = Counter(), Counter()
+    for i, amount in IRLinkModel.objects.filter(
+            recipe__in=recipes).values_list('ingredient_id', 'amount'):
+        amounts[i] += amount
+        counts[i] += 1
+    shopping_list.apply_deltas([user.id], {
+        i: (amounts[i], counts[i]) for i in amounts
+    })
+    return baskets
+
+
+def make_follows(user, authors):
+    return Follow.objects.bulk_create([
+        Follow(follower=user, following=author) for author in authors
+    ])
+
+
+def build_world(n):
+    viewer, = make_users(1, prefix='viewer')
+    authors = make_users(n, prefix='author')
+    prolific, = make_users(1, prefix='prolific')
+    staples = make_ingredients(2, prefix='staple')
+    ingredients = make_ingredients(n)
+    recipes = make_recipes(authors, staples)
+    own, = make_recipes([viewer], ingredients)
+    make_recipes([prolific], staples, per_author=n)
+    make_favorites(viewer, recipes)
+    make_baskets(viewer, recipes)
+    make_follows(viewer, authors)
+    IngredientCatalog.bump_version()
+    return {
+        'n': n,
+        'viewer': viewer,
+        'own': own.id,
+        'recipe': recipes[0].id,
+        'author': authors[0].id,
+        'prolific': prolific.id,
+        'ingredient': ingredients[0].id,
+        'ingredients': ingredients,
+    }
@@ -0,0 +1,56 @@
+from hashlib import sha1
+
+from backend.viewer import viewer_sets
+from django.conf import settings
+from django.core.cache import cache
+
+from .catalog import IngredientCatalog
+from .models import Recipe
+from .serializers import GetRecipeSerializer
+
+
+def card_keys(request, rows):
+    version = IngredientCatalog.current_version()
+    host = request.build_absolute_uri('/')
+    return {
+        row['id']: 'card:' + sha1(repr(
+            (host, version, row['id'], row['updated_at'],
+             row['author__updated_at'])
+        ).encode()).hexdigest()
+        for row in rows
+    }
+
+
+def static_cards(request, rows):
+    keys = card_keys(request, rows)
+    cached = cache.get_many(keys.values())
+    missing = [i for i, key in keys.items() if key not in cached]
+    if missing:
+        rendered = GetRecipeSerializer(
+            Recipe.objects.with_card_data().filter(id__in=missing),
+            many=True,
+            context={'request': request, 'static_card': True},
+        ).data
+        fresh = {keys[card['id']]: dict(card) for card in rendered}
+        cache.set_many(fresh, settings.CARD_CACHE_TTL)
+        cached.update(fresh)
+    return [cached[key] for key in keys.values() if key in cached]
+
+
+def personalize(cards, sets):
+    return [{
+        **card,
+        'author': {
+            **card['author'],
+            'is_subscribed': card['author']['id'] in sets['follower'],
+        },
+        'is_favorited': card['id'] in sets['fav_u'],
+        'is_in_shopping_cart': card['id'] in sets['basket_u'],
+    } for card in cards]
+
+
+def render_cards(request, rows, state=None):
+    cards = static_cards(request, rows)
+    if not request.user.is_authenticated:
+        return cards
+    return personalize(cards, viewer_sets(request.user, state))
@@ -0,0 +1,78 @@
+import threading
+from bisect import bisect_left
+from collections import namedtuple
+from uuid import uuid4
+
+from django.core.cache import cache
+
+from .models import Ingredient
+
+Snapshot = namedtuple('Snapshot', ['version', 'rows', 'by_id', 'names',
+                                   'name_rows'])
+
+
+class IngredientCatalog:
+    version_key = 'ingredients:version'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = Snapshot(None, [], {}, [], [])
+
+    @classmethod
+    def current_version(cls):
+        version = cache.get(cls.version_key)
+        if version is None:
+            cache.add(cls.version_key, uuid4().hex, None)
+            version = cache.get(cls.version_key)
+        return version
+
+    @classmethod
+    def bump_version(cls):
+        cache.set(cls.version_key, uuid4().hex, None)
+
+    def _load(self, version):
+        rows = list(Ingredient.objects.values(
+            'id', 'name', 'measurement_unit'
+        ))
+        name_rows = sorted(
+            rows, key=lambda i: (i['name'].casefold(), i['id'])
+        )
+        return Snapshot(
+            version=version,
+            rows=rows,
+            by_id={i['id']: i for i in rows},
+            names=[i['name'].casefold() for i in name_rows],
+            name_rows=name_rows,
+        )
+
+    def snapshot(self):
+        version = self.current_version()
+        if version != self._snapshot.version:
+            with self._lock:
+                if version != self._snapshot.version:
+                    self._snapshot = self._load(version)
+        return self._snapshot
+
+    def all(self):
+        return self.snapshot().rows
+
+    def get(self, ingredient_id):
+        return self.snapshot().by_id.get(ingredient_id)
+
+    def missing(self, ids):
+        by_id = self.snapshot().by_id
+        return [i for i in ids if i not in by_id]
+
+    def search(self, prefix):
+        snapshot = self.snapshot()
+        prefix = prefix.casefold()
+        found = []
+        pos = bisect_left(snapshot.names, prefix)
+        while (pos < len(snapshot.names)
+               and snapshot.names[pos].startswith(prefix)):
+            found.append(snapshot.name_rows[pos])
+            pos += 1
+        return sorted(found, key=lambda i: i['id'])
+
+
+ingredient_catalog = IngredientCatalog()
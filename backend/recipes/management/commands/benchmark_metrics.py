@@ -0,0 +1,71 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from recipes.benchmarking import build_world
+
+ROUTES = (
+    '/api/recipes/?limit=10',
+    '/api/recipes/{recipe}/',
+    '/api/users/subscriptions/?limit=10&recipes_limit=3',
+    '/api/recipes/download_shopping_cart/',
+    '/api/ingredients/?name=ingredient',
+)
+MIDDLEWARE = 'backend.metrics.MetricsMiddleware'
+
+
+class Command(BaseCommand):
+    help = ('Измеряет накладные расходы MetricsMiddleware '
+            'на один запрос к основным маршрутам API.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--objects', type=int, default=10)
+
+    def handle(self, *args, requests, objects, **options):
+        without = [m for m in settings.MIDDLEWARE if m != MIDDLEWARE]
+        report = {}
+        with transaction.atomic(), override_settings(
+                ALLOWED_HOSTS=['testserver']):
+            world = build_world(objects)
+            token = str(AccessToken.for_user(world['viewer']))
+            clients = {}
+            for name, middleware in (('without', without),
+                                     ('with', [MIDDLEWARE] + without)):
+                with override_settings(MIDDLEWARE=middleware):
+                    clients[name] = Client(
+                        HTTP_AUTHORIZATION=f'Token {token}'
+                    )
+                    self.fetch(clients[name], '/api/ingredients/')
+            for route in ROUTES:
+                path = route.format(**world)
+                timings = {name: [] for name in clients}
+                for _ in range(requests):
+                    for name, client in clients.items():
+                        timings[name].append(self.fetch(client, path))
+                medians = {
+                    name: sorted(values)[len(values) // 2] * 1e6
+                    for name, values in timings.items()
+                }
+                report[route] = {
+                    'without_us': round(medians['without'], 1),
+                    'with_us': round(medians['with'], 1),
+                    'overhead_us': round(
+                        medians['with'] - medians['without'], 1
+                    ),
+                }
+            transaction.set_rollback(True)
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def fetch(self, client, path):
+        start = time.perf_counter()
+        response = client.get(path)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return time.perf_counter() - start
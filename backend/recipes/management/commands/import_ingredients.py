@@ -0,0 +1,93 @@
+import csv
+import hashlib
+import json
+from pathlib import Path
+
+from backend.response_cache import bump_generation
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from recipes.catalog import IngredientCatalog
+from recipes.models import ImportChecksum, Ingredient
+
+
+class Command(BaseCommand):
+    help = 'Загружает ингредиенты из CSV/JSON, записывая только изменения.'
+
+    source = 'ingredients'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default=settings.BASE_DIR / 'fixtures' / 'ingredients.json',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Сверить данные даже при совпадении контрольной суммы.',
+        )
+
+    def handle(self, *args, path, batch_size=1000, force=False, **options):
+        path = Path(path)
+        if not path.is_file():
+            raise CommandError(f'Файл {path} не найден.')
+        checksum = self.checksum(path)
+        stored = ImportChecksum.objects.filter(source=self.source).first()
+        if stored and stored.checksum == checksum and not force:
+            self.stdout.write('Ингредиенты не изменились.')
+            return
+        existing = {
+            name: unit for name, unit in
+            Ingredient.objects.values_list('name', 'measurement_unit')
+        }
+        changed = [
+            Ingredient(name=name, measurement_unit=unit)
+            for name, unit in self.read_rows(path)
+            if existing.get(name) != unit
+        ]
+        with transaction.atomic():
+            Ingredient.objects.bulk_create(
+                changed,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['name'],
+                update_fields=['measurement_unit'],
+            )
+            ImportChecksum.objects.update_or_create(
+                source=self.source, defaults={'checksum': checksum}
+            )
+            if changed:
+                transaction.on_commit(IngredientCatalog.bump_version)
+                bump_generation(Ingredient)
+        self.stdout.write(self.style.SUCCESS(
+            f'Добавлено или обновлено ингредиентов: {len(changed)}'
+        ))
+
+    def checksum(self, path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def read_rows(self, path):
+        seen = set()
+        for name, unit in self.parse(path):
+            name, unit = name.strip(), unit.strip()
+            if name and name not in seen:
+                seen.add(name)
+                yield name, unit
+
+    def parse(self, path):
+        with open(path, encoding='utf-8') as f:
+            if path.suffix.lower() == '.csv':
+                for row in csv.reader(f):
+                    if len(row) >= 2:
+                        yield row[0], row[1]
+                return
+            for item in json.load(f):
+                item = item.get('fields', item)
+                yield item['name'], item['measurement_unit']
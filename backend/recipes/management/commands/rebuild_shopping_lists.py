@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.models import BasketIngredient
+from recipes.shopping_list import expected_rows
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает списки покупок из корзин и сообщает о расхождениях.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только показать расхождения, ничего не меняя.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, check=False, batch_size=1000, **options):
+        with transaction.atomic():
+            expected = {
+                (row['recipe__basket_r__user'], row['ingredient']):
+                    (row['total_amount'], row['recipe_count'])
+                for row in expected_rows().iterator(chunk_size=batch_size)
+            }
+            stored = {
+                (row[0], row[1]): (row[2], row[3])
+                for row in BasketIngredient.objects.values_list(
+                    'user_id', 'ingredient_id', 'total_amount',
+                    'recipe_count'
+                ).iterator(chunk_size=batch_size)
+            }
+            drift = {
+                key for key in expected.keys() | stored.keys()
+                if expected.get(key) != stored.get(key)
+            }
+            self.stdout.write(f'Расхождений: {len(drift)}')
+            if check or not drift:
+                return
+            users = {user_id for user_id, _ in drift}
+            BasketIngredient.objects.filter(user_id__in=users).delete()
+            BasketIngredient.objects.bulk_create([
+                BasketIngredient(
+                    user_id=user_id, ingredient_id=ingredient_id,
+                    total_amount=total, recipe_count=count
+                )
+                for (user_id, ingredient_id), (total, count)
+                in expected.items()
+                if user_id in users
+            ], batch_size=batch_size)
+            self.stdout.write(self.style.SUCCESS(
+                f'Пересчитано пользователей: {len(users)}'
+            ))
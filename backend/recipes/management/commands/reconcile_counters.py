@@ -0,0 +1,54 @@
+from backend.authentication import forget_user
+from backend.response_cache import bump_generation
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from recipes.models import FavRecipe, Recipe
+from users.models import Follow, User
+
+
+def counted(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by().values(field)
+        .annotate(total=Count('id')).values('total')
+    ), 0)
+
+
+class Command(BaseCommand):
+    help = 'Сверяет счётчики избранного, рецептов и подписчиков с данными.'
+
+    counters = (
+        (Recipe, 'favorites_count', FavRecipe, 'recipe'),
+        (User, 'recipes_count', Recipe, 'author'),
+        (User, 'followers_count', Follow, 'following'),
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только показать расхождения, ничего не меняя.',
+        )
+
+    def handle(self, *args, check=False, **options):
+        for model, field, source, source_field in self.counters:
+            actual = counted(source, source_field)
+            drifted = list(
+                model.objects.annotate(actual=actual)
+                .exclude(**{field: F('actual')})
+                .values_list('pk', flat=True)
+            )
+            self.stdout.write(
+                f'{model.__name__}.{field}: расхождений {len(drifted)}'
+            )
+            if drifted and not check:
+                model.objects.filter(pk__in=drifted).update(
+                    **{field: actual, 'updated_at': timezone.now()}
+                )
+                bump_generation(model)
+                if model is User:
+                    for pk in drifted:
+                        forget_user(pk)
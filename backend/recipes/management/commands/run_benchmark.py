@@ -0,0 +1,204 @@
+import json
+import math
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.error import HTTPError, URLError
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.benchmarking import PASSWORD
+
+SCENARIOS = (
+    ('recipe_list', '/api/recipes/?page={page}&limit=6'),
+    ('recipe_list_deep_page', '/api/recipes/?page={deep_page}&limit=6'),
+    ('recipe_list_cursor', '/api/recipes/?pagination=cursor&limit=6'),
+    ('recipe_list_deep_cursor', '{deep_cursor}'),
+    ('recipe_list_favorited', '/api/recipes/?is_favorited=1&limit=6'),
+    ('recipe_list_shopping_cart',
+     '/api/recipes/?is_in_shopping_cart=1&limit=6'),
+    ('recipe_list_author', '/api/recipes/?author={author}&limit=6'),
+    ('recipe_detail', '/api/recipes/{recipe}/'),
+    ('subscriptions', '/api/users/subscriptions/?limit=6&recipes_limit=3'),
+    ('download_shopping_cart', '/api/recipes/download_shopping_cart/'),
+    ('ingredient_search', '/api/ingredients/?name={prefix}'),
+    ('ingredient_detail', '/api/ingredients/{ingredient}/'),
+)
+
+
+def relative(link, **params):
+    parts = urlsplit(link)
+    query = dict(parse_qsl(parts.query))
+    query.update(params)
+    return f'{parts.path}?{urlencode(query)}'
+
+
+def percentile(values, rank):
+    return values[max(0, math.ceil(rank / 100 * len(values)) - 1)]
+
+
+class Command(BaseCommand):
+    help = ('Нагружает основные маршруты API по HTTP и выводит задержки '
+            'p50/p95/p99 и пропускную способность в формате JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000')
+        parser.add_argument('--prefix', default='bench')
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--scenario', action='append', dest='scenarios')
+        parser.add_argument('--label', default='')
+        parser.add_argument('--output')
+        parser.add_argument(
+            '--compare',
+            help='Отчёт предыдущего прогона для сравнения задержек.',
+        )
+
+    def handle(self, *args, **options):
+        self.base_url = options['base_url'].rstrip('/')
+        self.timeout = options['timeout']
+        rng = random.Random(options['seed'])
+        tokens = [
+            self.login(f'{options["prefix"]}{i}@example.com')
+            for i in range(options['users'])
+        ]
+        listing = self.fetch('/api/recipes/?limit=100')[1]
+        recipes = listing['results']
+        ingredients = self.fetch('/api/ingredients/')[1]
+        if not recipes or not ingredients:
+            raise CommandError(
+                'Нет данных, сначала выполните seed_benchmark_data.'
+            )
+        last_page = math.ceil(listing['count'] / 6)
+        cursors = []
+        if self.selected('recipe_list_deep_cursor', options):
+            cursors = self.deep_cursors()
+        params = {
+            'page': lambda: rng.randint(1, 10),
+            'deep_page': lambda: rng.randint(max(1, last_page - 9), last_page),
+            'deep_cursor': lambda: rng.choice(cursors),
+            'author': lambda: rng.choice(recipes)['author']['id'],
+            'recipe': lambda: rng.choice(recipes)['id'],
+            'prefix': lambda: rng.choice(ingredients)['name'][:2],
+            'ingredient': lambda: rng.choice(ingredients)['id'],
+        }
+        results = {}
+        for name, path in SCENARIOS:
+            if not self.selected(name, options):
+                continue
+            calls = [
+                (path.format(**{key: make() for key, make in params.items()
+                                if f'{{{key}}}' in path}),
+                 rng.choice(tokens))
+                for _ in range(options['warmup'] + options['requests'])
+            ]
+            results[name] = self.run(
+                calls[options['warmup']:], calls[:options['warmup']],
+                options['concurrency'],
+            )
+            self.stderr.write(
+                f'{name}: p50 {results[name]["p50_ms"]} мс, '
+                f'{results[name]["rps"]} запр/с'
+            )
+        report = json.dumps({
+            'label': options['label'],
+            'base_url': self.base_url,
+            'started': datetime.now(timezone.utc).isoformat(),
+            'concurrency': options['concurrency'],
+            'requests': options['requests'],
+            'scenarios': results,
+        }, ensure_ascii=False, indent=2)
+        if options['compare']:
+            self.compare(options['compare'], results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(report + '\n')
+        else:
+            self.stdout.write(report)
+
+    def selected(self, name, options):
+        return not options['scenarios'] or name in options['scenarios']
+
+    def deep_cursors(self, depth=10, step=500):
+        cursors = deque(['/api/recipes/?pagination=cursor&limit=6'], depth)
+        link = f'/api/recipes/?pagination=cursor&limit={step}'
+        while link:
+            link = self.fetch(relative(link))[1]['next']
+            if link:
+                cursors.append(relative(link, limit=6))
+        return list(cursors)
+
+    def compare(self, path, results):
+        with open(path, encoding='utf-8') as f:
+            baseline = json.load(f)
+        self.stderr.write(f'Сравнение с "{baseline["label"]}":')
+        for name, current in results.items():
+            before = baseline['scenarios'].get(name)
+            if before is None:
+                continue
+            for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+                delta = current[key] - before[key]
+                share = delta / before[key] * 100 if before[key] else 0
+                self.stderr.write(
+                    f'{name} {key}: {before[key]} -> {current[key]} '
+                    f'({delta:+.2f} мс, {share:+.1f}%)'
+                )
+
+    def fetch(self, path, token=None, data=None):
+        request = Request(self.base_url + path)
+        if token:
+            request.add_header('Authorization', f'Token {token}')
+        if data is not None:
+            request.data = json.dumps(data).encode()
+            request.add_header('Content-Type', 'application/json')
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                status = response.status
+        except HTTPError as error:
+            return error.code, None
+        except URLError as error:
+            raise CommandError(f'{self.base_url} недоступен: {error.reason}')
+        if response.headers.get_content_type() == 'application/json':
+            return status, json.loads(body)
+        return status, body
+
+    def login(self, email):
+        status, body = self.fetch(
+            '/api/auth/token/login/',
+            data={'email': email, 'password': PASSWORD},
+        )
+        if status != 200:
+            raise CommandError(f'Не удалось войти как {email}: HTTP {status}')
+        return body['auth_token']
+
+    def timed(self, call):
+        start = time.perf_counter()
+        status = self.fetch(*call)[0]
+        return time.perf_counter() - start, status
+
+    def run(self, calls, warmup, concurrency):
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(self.timed, warmup))
+            start = time.perf_counter()
+            timings = list(pool.map(self.timed, calls))
+            elapsed = time.perf_counter() - start
+        latencies = sorted(seconds * 1000 for seconds, _ in timings)
+        return {
+            'requests': len(timings),
+            'errors': sum(status >= 400 for _, status in timings),
+            'rps': round(len(timings) / elapsed, 1),
+            'mean_ms': round(sum(latencies) / len(latencies), 2),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'max_ms': round(latencies[-1], 2),
+        }
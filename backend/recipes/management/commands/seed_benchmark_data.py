@@ -0,0 +1,186 @@
+import bisect
+import random
+from itertools import accumulate
+
+from backend.response_cache import bump_generation
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from recipes.benchmarking import PASSWORD
+from recipes.catalog import IngredientCatalog
+from recipes.models import Basket, FavRecipe, Ingredient, IRLinkModel, Recipe
+from users.models import Follow, User
+
+
+class Zipf:
+
+    def __init__(self, items, exponent, rng):
+        self.items = list(items)
+        rng.shuffle(self.items)
+        self.weights = list(accumulate(
+            1 / rank ** exponent for rank in range(1, len(self.items) + 1)
+        ))
+        self.rng = rng
+
+    def draw(self):
+        point = self.rng.random() * self.weights[-1]
+        return self.items[bisect.bisect(self.weights, point)]
+
+    def sample(self, count):
+        count = min(count, len(self.items))
+        picked = set()
+        for _ in range(count * 10):
+            if len(picked) >= count:
+                break
+            picked.add(self.draw())
+        return picked
+
+
+class Command(BaseCommand):
+    help = ('Создаёт синтетические данные для нагрузочного тестирования '
+            'с распределением популярности по закону Ципфа.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=5000)
+        parser.add_argument('--ingredients', type=int, default=2000)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument('--favorites-per-user', type=int, default=20)
+        parser.add_argument('--baskets-per-user', type=int, default=5)
+        parser.add_argument('--follows-per-user', type=int, default=10)
+        parser.add_argument('--exponent', type=float, default=1.1)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='bench')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Удалить ранее созданные данные с тем же префиксом.',
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.exponent = options['exponent']
+        prefix = options['prefix']
+        users = User.objects.filter(username__startswith=prefix)
+        if options['clear']:
+            users.delete()
+        elif users.exists():
+            raise CommandError(
+                f'Пользователи с префиксом "{prefix}" уже есть, '
+                'используйте --clear.'
+            )
+        with transaction.atomic():
+            user_ids = self.create_users(options['users'], prefix)
+            ingredient_ids = self.create_ingredients(
+                options['ingredients'], prefix
+            )
+            recipe_ids = self.create_recipes(
+                options['recipes'], user_ids, ingredient_ids,
+                options['ingredients_per_recipe'],
+            )
+            recipes = Zipf(recipe_ids, self.exponent, self.rng)
+            self.create_links(
+                FavRecipe, user_ids, recipes,
+                options['favorites_per_user'], 'user_id', 'recipe_id',
+            )
+            self.create_links(
+                Basket, user_ids, recipes,
+                options['baskets_per_user'], 'user_id', 'recipe_id',
+            )
+            self.create_links(
+                Follow, user_ids, Zipf(user_ids, self.exponent, self.rng),
+                options['follows_per_user'], 'follower_id', 'following_id',
+            )
+        IngredientCatalog.bump_version()
+        bump_generation(Recipe, IRLinkModel, Ingredient, User)
+        call_command('reconcile_counters', stdout=self.stdout)
+        call_command(
+            'rebuild_shopping_lists',
+            batch_size=self.batch_size, stdout=self.stdout,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Пароль пользователей {prefix}N@example.com: {PASSWORD}'
+        ))
+
+    def sizes(self, mean, total):
+        return min(total, int(self.rng.expovariate(1 / mean))) if mean else 0
+
+    def save(self, model, rows):
+        created = []
+        for start in range(0, len(rows), self.batch_size):
+            created += model.objects.bulk_create(
+                rows[start:start + self.batch_size]
+            )
+        return [row.id for row in created]
+
+    def create_users(self, count, prefix):
+        password = make_password(PASSWORD)
+        ids = self.save(User, [
+            User(
+                email=f'{prefix}{i}@example.com',
+                username=f'{prefix}{i}',
+                first_name='Имя',
+                last_name='Фамилия',
+                password=password,
+            )
+            for i in range(count)
+        ])
+        self.stdout.write(f'Пользователей: {len(ids)}')
+        return ids
+
+    def create_ingredients(self, count, prefix):
+        ids = list(Ingredient.objects.order_by('id').values_list(
+            'id', flat=True
+        )[:count])
+        ids += self.save(Ingredient, [
+            Ingredient(name=f'{prefix} {i}', measurement_unit='г')
+            for i in range(count - len(ids))
+        ])
+        self.stdout.write(f'Ингредиентов: {len(ids)}')
+        return ids
+
+    def create_recipes(self, count, user_ids, ingredient_ids, per_recipe):
+        authors = Zipf(user_ids, self.exponent, self.rng)
+        ingredients = Zipf(ingredient_ids, self.exponent, self.rng)
+        ids = self.save(Recipe, [
+            Recipe(
+                author_id=authors.draw(),
+                name=f'Рецепт {i}',
+                image='recipes/sample.png',
+                text='Описание',
+                cooking_time=self.rng.randint(5, 180),
+            )
+            for i in range(count)
+        ])
+        links = []
+        for recipe_id in ids:
+            size = max(1, self.sizes(per_recipe, len(ingredient_ids)))
+            links += [
+                IRLinkModel(recipe_id=recipe_id, ingredient_id=i,
+                            amount=self.rng.randint(1, 500))
+                for i in sorted(ingredients.sample(size))
+            ]
+            if len(links) >= self.batch_size:
+                self.save(IRLinkModel, links)
+                links = []
+        self.save(IRLinkModel, links)
+        self.stdout.write(f'Рецептов: {len(ids)}')
+        return ids
+
+    def create_links(self, model, user_ids, targets, mean, owner, target):
+        rows, total = [], 0
+        for user_id in user_ids:
+            picked = targets.sample(self.sizes(mean, len(targets.items)))
+            if model is Follow:
+                picked.discard(user_id)
+            rows += [model(**{owner: user_id, target: i})
+                     for i in sorted(picked)]
+            if len(rows) >= self.batch_size:
+                total += len(self.save(model, rows))
+                rows = []
+        total += len(self.save(model, rows))
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {total}')
@@ -4,8 +4,39 @@ from django.db import models
 from users.models import User
 
 
+class RecipeQuerySet(models.QuerySet):
+    def with_card_data(self):
+        return self.select_related('author').prefetch_related(
+            models.Prefetch(
+                'r_link_i',
+                queryset=IRLinkModel.objects.select_related('ingredient')
+            )
+        )
+
+    def card_stamps(self):
+        return self.prefetch_related(None).values(
+            'id', 'updated_at', 'author__updated_at'
+        )
+
+    def with_user_flags(self, user):
+        if not user.is_authenticated:
+            return self
+        return self.annotate(
+            is_favorited=models.Exists(FavRecipe.objects.filter(
+                user=user, recipe=models.OuterRef('pk'))),
+            is_in_shopping_cart=models.Exists(Basket.objects.filter(
+                user=user, recipe=models.OuterRef('pk'))),
+        )
+
+
 class Recipe(models.Model):
     class Meta:
+        indexes = [
+            models.Index(
+                fields=['author', '-id'],
+                name='recipe_author_id'
+            )
+        ]
         ordering = ['-id', ]
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
@@ -13,6 +44,8 @@ class Recipe(models.Model):
     def __str__(self):
         return self.name
 
+    objects = RecipeQuerySet.as_manager()
+
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -33,6 +66,13 @@ class Recipe(models.Model):
         verbose_name="Изображение"
     )
 
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии изображения'
+    )
+
     text = models.TextField(
         unique=False,
         blank=False,
@@ -53,6 +93,17 @@ class Recipe(models.Model):
         ]
     )
 
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В избранном'
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменён'
+    )
+
 
 class Ingredient(models.Model):
     class Meta:
@@ -188,3 +239,73 @@ class Basket(models.Model):
         related_name='basket_r',
         verbose_name='Рецепт'
     )
+
+
+class BasketIngredient(models.Model):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name='basket_i'
+            )
+        ]
+        ordering = ['id', ]
+        verbose_name = 'Продукт в списке покупок'
+        verbose_name_plural = 'Продукты в списках покупок'
+
+    def __str__(self):
+        a = self.ingredient.measurement_unit
+        return (
+            f"{self.total_amount}{a} {self.ingredient.name}"
+            f" в списке у {self.user.username}"
+        )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='basket_total_u',
+        verbose_name='Пользователь'
+    )
+
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='basket_total_i',
+        verbose_name='Ингредиент'
+    )
+
+    total_amount = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Общее количество'
+    )
+
+    recipe_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число рецептов'
+    )
+
+
+class ImportChecksum(models.Model):
+    class Meta:
+        ordering = ['source', ]
+        verbose_name = 'Контрольная сумма импорта'
+        verbose_name_plural = 'Контрольные суммы импорта'
+
+    def __str__(self):
+        return f"{self.source}: {self.checksum}"
+
+    source = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name='Источник'
+    )
+
+    checksum = models.CharField(
+        max_length=64,
+        verbose_name='Контрольная сумма'
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменён'
+    )
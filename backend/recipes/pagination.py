@@ -1,6 +1,32 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class KeysetPagination(CursorPagination):
+    page_size_query_param = 'limit'
+    page_size = 10
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(queryset.query.order_by or queryset.model._meta.ordering)
 
 
 class MainPagination(PageNumberPagination):
     page_size_query_param = 'limit'
     page_size = 10
+    cursor_paginator = None
+
+    def use_cursor(self, request):
+        return (KeysetPagination.cursor_query_param in request.query_params
+                or request.query_params.get('pagination') == 'cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = KeysetPagination()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -1,11 +1,21 @@
-from backend.constants import MIN_INT, MAX_INT, MAX_IMAGE_SIZE, MB_SIZE
+import json
+from backend.constants import (MIN_INT, MAX_INT, MAX_IMAGE_SIZE, MB_SIZE,
+                               RECIPE_IMAGE_VARIANTS)
+from backend.counters import bump_counter
+from backend.fields import StreamingImageField
+from backend.images import variant_urls
+from backend.serializers import ModelSerializer
 from drf_extra_fields.fields import Base64ImageField
+from users.models import User
 from users.serializers import GetUserSerializer
+from django.db import transaction
 from rest_framework import serializers
+from . import shopping_list
+from .catalog import ingredient_catalog
 from .models import Recipe, IRLinkModel, Ingredient, FavRecipe, Basket
 
 
-class MealSerializer(serializers.ModelSerializer):
+class MealSerializer(ModelSerializer):
     id = serializers.IntegerField()
     amount = serializers.IntegerField(min_value=MIN_INT, max_value=MAX_INT)
 
@@ -14,7 +24,7 @@ class MealSerializer(serializers.ModelSerializer):
         fields = ['id', 'amount']
 
 
-class IRLinkSerializer(serializers.ModelSerializer):
+class IRLinkSerializer(ModelSerializer):
     id = serializers.ReadOnlyField(source='ingredient.id')
     name = serializers.ReadOnlyField(source='ingredient.name')
     measurement_unit = serializers.ReadOnlyField(
@@ -31,9 +41,10 @@ class IRLinkSerializer(serializers.ModelSerializer):
         ]
 
 
-class GetRecipeSerializer(serializers.ModelSerializer):
+class GetRecipeSerializer(ModelSerializer):
     author = GetUserSerializer(read_only=True)
     image = Base64ImageField()
+    image_variants = serializers.SerializerMethodField()
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
     ingredients = IRLinkSerializer(
@@ -52,25 +63,41 @@ class GetRecipeSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'image_variants',
             'text',
-            'cooking_time'
+            'cooking_time',
+            'favorites_count'
         ]
 
+    def get_image_variants(self, obj):
+        return variant_urls(self.context['request'], obj.image,
+                            obj.image_variants, RECIPE_IMAGE_VARIANTS)
+
     def get_is_favorited(self, obj):
+        if self.context.get('static_card'):
+            return False
+        annotated = getattr(obj, 'is_favorited', None)
+        if annotated is not None:
+            return annotated
         user = self.context['request'].user
         if user.is_authenticated:
             return obj.fav_r.filter(user=user).exists()
         return False
 
     def get_is_in_shopping_cart(self, obj):
+        if self.context.get('static_card'):
+            return False
+        annotated = getattr(obj, 'is_in_shopping_cart', None)
+        if annotated is not None:
+            return annotated
         user = self.context['request'].user
         if user.is_authenticated:
             return obj.basket_r.filter(user=user).exists()
         return False
 
 
-class NewRecipeSerializer(serializers.ModelSerializer):
-    image = Base64ImageField(required=True)
+class NewRecipeSerializer(ModelSerializer):
+    image = StreamingImageField(required=True)
     cooking_time = serializers.IntegerField(min_value=MIN_INT, max_value=MAX_INT)
     ingredients = MealSerializer(many=True, write_only=True)
 
@@ -85,21 +112,40 @@ class NewRecipeSerializer(serializers.ModelSerializer):
             'cooking_time'
         ]
 
+    def to_internal_value(self, data):
+        ingredients = data.get('ingredients')
+        if hasattr(data, 'getlist') and isinstance(ingredients, str):
+            data = data.dict()
+            try:
+                data['ingredients'] = json.loads(ingredients)
+            except ValueError:
+                raise serializers.ValidationError(
+                    {"ingredients": "Неверный формат списка ингредиентов."}
+                )
+        return super().to_internal_value(data)
+
+    @transaction.atomic
     def create(self, data):
         ingredients = data.pop('ingredients')
         recipe = Recipe.objects.create(author=self.context['request'].user, **data)
         self.add_ingredients(recipe, ingredients)
+        bump_counter(User, recipe.author_id, 'recipes_count', 1)
         return recipe
 
     def update(self, instance, data):
         ingredients = data.pop('ingredients', None)
         if ingredients is None:
             raise serializers.ValidationError("Добавьте ингредиенты")
-        for attr, value in data.items():
-            setattr(instance, attr, value)
-        instance.save()
-        instance.r_link_i.all().delete()
-        self.add_ingredients(instance, ingredients)
+        with transaction.atomic():
+            old_amounts = shopping_list.recipe_amounts(instance)
+            for attr, value in data.items():
+                setattr(instance, attr, value)
+            instance.save()
+            instance.r_link_i.all().delete()
+            self.add_ingredients(instance, ingredients)
+            shopping_list.change_recipe(instance, old_amounts, {
+                j['id']: j['amount'] for j in ingredients
+            })
         return instance
 
     def validate(self, data):
@@ -123,8 +169,7 @@ class NewRecipeSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({
                 "detail": "Ингредиенты не должны повторяться."
             })
-        ingredients_exist = Ingredient.objects.filter(id__in=i).count()
-        if ingredients_exist != len(i):
+        if ingredient_catalog.missing(i):
             raise serializers.ValidationError(
                 {"detail": "Некоторые ингредиенты не найдены."}
             )
@@ -139,13 +184,16 @@ class NewRecipeSerializer(serializers.ModelSerializer):
         IRLinkModel.objects.bulk_create(ingredients_to_add)
 
     def to_representation(self, instance):
+        instance = Recipe.objects.with_card_data().with_user_flags(
+            self.context['request'].user
+        ).get(pk=instance.pk)
         return GetRecipeSerializer(
             instance,
             context=self.context,
         ).data
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(ModelSerializer):
     class Meta:
         model = Ingredient
         fields = [
@@ -155,7 +203,7 @@ class IngredientSerializer(serializers.ModelSerializer):
         ]
 
 
-class FavoriteSerializer(serializers.ModelSerializer):
+class FavoriteSerializer(ModelSerializer):
     id = serializers.IntegerField(source='recipe.id', read_only=True)
     name = serializers.CharField(source='recipe.name', read_only=True)
     image = serializers.ImageField(source='recipe.image', read_only=True)
@@ -173,7 +221,7 @@ class FavoriteSerializer(serializers.ModelSerializer):
         ]
 
 
-class BasketSerializer(serializers.ModelSerializer):
+class BasketSerializer(ModelSerializer):
     id = serializers.IntegerField(source='recipe.id', read_only=True)
     name = serializers.CharField(source='recipe.name', read_only=True)
     image = serializers.ImageField(source='recipe.image', read_only=True)
@@ -0,0 +1,89 @@
+from django.db import transaction
+from django.db.models import (Case, Count, F, IntegerField, Q, Sum, Value,
+                              When)
+from django.db.models.functions import Greatest
+
+from .models import Basket, BasketIngredient, IRLinkModel
+
+
+def recipe_amounts(recipe):
+    return dict(IRLinkModel.objects.filter(recipe=recipe).values_list(
+        'ingredient_id', 'amount'
+    ))
+
+
+def basket_users(recipe):
+    return list(Basket.objects.filter(recipe=recipe).values_list(
+        'user_id', flat=True
+    ))
+
+
+def apply_deltas(user_ids, deltas):
+    if not user_ids or not deltas:
+        return
+
+    def by_ingredient(index):
+        return Case(
+            *[When(ingredient_id=i, then=Value(d[index]))
+              for i, d in deltas.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+
+    rows = BasketIngredient.objects.filter(
+        user_id__in=user_ids, ingredient_id__in=deltas
+    )
+    emptied = Q()
+    for i, (_, recipes) in deltas.items():
+        if recipes < 0:
+            emptied |= Q(ingredient_id=i, recipe_count__lte=-recipes)
+    with transaction.atomic():
+        BasketIngredient.objects.bulk_create([
+            BasketIngredient(user_id=u, ingredient_id=i)
+            for u in user_ids
+            for i, (_, recipes) in deltas.items()
+            if recipes > 0
+        ], ignore_conflicts=True)
+        if emptied:
+            rows.filter(emptied).delete()
+        rows.update(
+            total_amount=Greatest(
+                F('total_amount') + by_ingredient(0), Value(0)),
+            recipe_count=Greatest(
+                F('recipe_count') + by_ingredient(1), Value(0)),
+        )
+
+
+def add_recipe(user_ids, recipe):
+    apply_deltas(user_ids, {
+        i: (amount, 1) for i, amount in recipe_amounts(recipe).items()
+    })
+
+
+def remove_recipe(user_ids, recipe):
+    apply_deltas(user_ids, {
+        i: (-amount, -1) for i, amount in recipe_amounts(recipe).items()
+    })
+
+
+def change_recipe(recipe, old, new):
+    deltas = {}
+    for i in old.keys() | new.keys():
+        if i not in new:
+            deltas[i] = (-old[i], -1)
+        elif i not in old:
+            deltas[i] = (new[i], 1)
+        elif old[i] != new[i]:
+            deltas[i] = (new[i] - old[i], 0)
+    if deltas:
+        apply_deltas(basket_users(recipe), deltas)
+
+
+def expected_rows():
+    return (
+        IRLinkModel.objects
+        .filter(recipe__basket_r__isnull=False)
+        .values('recipe__basket_r__user', 'ingredient')
+        .annotate(total_amount=Sum('amount'), recipe_count=Count('recipe'))
+        .order_by()
+    )
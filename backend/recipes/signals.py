@@ -0,0 +1,49 @@
+from backend.constants import RECIPE_IMAGE_VARIANTS
+from backend.images import discard_variants, schedule_variants
+from backend.response_cache import bump_generation
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import shopping_list
+from .catalog import IngredientCatalog
+from .models import Basket, Ingredient, IRLinkModel, Recipe
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredient_changed(sender, **kwargs):
+    transaction.on_commit(IngredientCatalog.bump_version)
+    bump_generation(Ingredient)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_variants(instance, 'image', RECIPE_IMAGE_VARIANTS)
+        bump_generation(Recipe)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    discard_variants(instance, 'image')
+    bump_generation(Recipe)
+
+
+@receiver(post_save, sender=IRLinkModel)
+@receiver(post_delete, sender=IRLinkModel)
+def recipe_changed(sender, **kwargs):
+    bump_generation(sender)
+
+
+@receiver(pre_delete, sender=Recipe)
+def recipe_deleting(sender, instance, **kwargs):
+    shopping_list.remove_recipe(
+        shopping_list.basket_users(instance), instance
+    )
+
+
+@receiver(post_delete, sender=Basket)
+def basket_deleted(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Basket) or getattr(origin, 'model', None) is Basket:
+        shopping_list.remove_recipe([instance.user_id], instance.recipe_id)
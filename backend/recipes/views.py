@@ -1,5 +1,12 @@
-from django.db.models import Q, Sum
-from django.http import HttpResponse
+import csv
+import json
+from backend.conditional import ConditionalGetMixin, make_etag, viewer_state
+from backend.counters import bump_counter
+from backend.response_cache import CachedResponseMixin
+from backend.viewer import forget_viewer
+from django.db import transaction
+from django.db.models import F
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework.permissions import (IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
@@ -8,7 +15,12 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 from rest_framework.exceptions import ValidationError
-from .models import Recipe, Ingredient, FavRecipe, Basket, IRLinkModel
+from users.models import User
+from . import shopping_list
+from .cards import render_cards
+from .catalog import IngredientCatalog, ingredient_catalog
+from .models import (Recipe, Ingredient, IRLinkModel, FavRecipe, Basket,
+                     BasketIngredient)
 from .serializers import (GetRecipeSerializer, NewRecipeSerializer,
                           IngredientSerializer, FavoriteSerializer,
                           BasketSerializer)
@@ -20,12 +32,45 @@ class IsAuthorOrReadOnly(BasePermission):
 
 
 class RecipesList:
-    queryset = Recipe.objects.all()
+    queryset = Recipe.objects.with_card_data()
+    cache_models = (Recipe, IRLinkModel, Ingredient, User)
+
+    def get_queryset(self):
+        return super().get_queryset().with_user_flags(self.request.user)
 
 
-class RecipeListView(RecipesList, generics.ListCreateAPIView):
+class RecipeListView(CachedResponseMixin, ConditionalGetMixin, RecipesList,
+                     generics.ListCreateAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    def card_page(self):
+        if not hasattr(self, 'card_rows'):
+            rows = self.filter_queryset(self.get_queryset()).card_stamps()
+            page = self.paginate_queryset(rows)
+            self.card_rows = list(rows) if page is None else page
+            self.card_envelope = (
+                None if page is None
+                else dict(self.get_paginated_response([]).data)
+            )
+        return self.card_rows, self.card_envelope
+
+    def get_validators(self, request, *args, **kwargs):
+        rows, envelope = self.card_page()
+        self.viewer = viewer_state(request.user)
+        return make_etag(
+            envelope,
+            [tuple(row.values()) for row in rows],
+            IngredientCatalog.current_version(),
+            self.viewer,
+        ), None
+
+    def list(self, request, *args, **kwargs):
+        rows, envelope = self.card_page()
+        cards = render_cards(request, rows, getattr(self, 'viewer', None))
+        if envelope is None:
+            return Response(cards)
+        return self.get_paginated_response(cards)
+
     def get_queryset(self):
         rows = super().get_queryset()
         user = self.request.user
@@ -34,14 +79,10 @@ class RecipeListView(RecipesList, generics.ListCreateAPIView):
             rows = rows.filter(author_id=author_id)
         favorited = self.request.query_params.get('is_favorited')
         if favorited and user.is_authenticated:
-            filter_for_user = Q(fav_r__user=user)
-            rows = rows.filter(filter_for_user
-                               if favorited == '1' else ~filter_for_user)
+            rows = rows.filter(is_favorited=favorited == '1')
         in_basket = self.request.query_params.get('is_in_shopping_cart')
         if in_basket and user.is_authenticated:
-            filter_for_user = Q(basket_r__user=user)
-            rows = rows.filter(filter_for_user
-                               if in_basket == '1' else ~filter_for_user)
+            rows = rows.filter(is_in_shopping_cart=in_basket == '1')
         return rows
 
     def get_serializer_class(self):
@@ -50,29 +91,59 @@ class RecipeListView(RecipesList, generics.ListCreateAPIView):
         return GetRecipeSerializer
 
 
-class RecipeView(RecipesList, generics.RetrieveUpdateDestroyAPIView):
+class RecipeView(CachedResponseMixin, ConditionalGetMixin, RecipesList,
+                 generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthorOrReadOnly]
     lookup_field = 'id'
     lookup_url_kwarg = 'recipe_id'
 
+    def get_validators(self, request, *args, **kwargs):
+        self.card_row = Recipe.objects.filter(
+            id=kwargs['recipe_id']
+        ).card_stamps().first()
+        if self.card_row is None:
+            return None, None
+        row = (self.card_row['updated_at'],
+               self.card_row['author__updated_at'],
+               IngredientCatalog.current_version())
+        self.viewer = viewer_state(request.user)
+        return make_etag(row, self.viewer), None
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.card_row is None:
+            raise Http404
+        return Response(render_cards(
+            request, [self.card_row], getattr(self, 'viewer', None)
+        )[0])
+
     def get_serializer_class(self):
         if self.request.method in ['PUT', 'PATCH']:
             return NewRecipeSerializer
         return GetRecipeSerializer
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+        bump_counter(User, instance.author_id, 'recipes_count', -1)
+
 
-class IngredientListView(generics.ListAPIView):
+class IngredientListView(CachedResponseMixin, ConditionalGetMixin,
+                         generics.ListAPIView):
     serializer_class = IngredientSerializer
     pagination_class = None
+    cache_models = (Ingredient,)
 
-    def get_queryset(self):
-        rows = self.request.query_params.get('name', None)
-        if not rows:
-            return Ingredient.objects.all()
-        rows = Ingredient.objects.filter(
-            Q(name__istartswith=rows),
-        )
-        return rows
+    def get_validators(self, request, *args, **kwargs):
+        return make_etag(
+            ingredient_catalog.snapshot().version,
+            request.query_params.get('name'),
+        ), None
+
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name', None)
+        if not name:
+            return Response(ingredient_catalog.all())
+        return Response(ingredient_catalog.search(name))
 
 
 class IngredientView(generics.RetrieveAPIView):
@@ -81,6 +152,12 @@ class IngredientView(generics.RetrieveAPIView):
     serializer_class = IngredientSerializer
     queryset = Ingredient.objects.all()
 
+    def retrieve(self, request, *args, **kwargs):
+        ingredient = ingredient_catalog.get(kwargs['ingredient_id'])
+        if ingredient is None:
+            raise Http404
+        return Response(ingredient)
+
 
 class ShortLinkView(RecipesList, generics.RetrieveAPIView):
     lookup_field = 'id'
@@ -108,8 +185,11 @@ class FavView(generics.CreateAPIView, generics.DestroyAPIView):
                 {"detail": "Рецепт уже в избранном."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        favorite = FavRecipe.objects.create(user=request.user,
-                                            recipe=recipe_in_fav)
+        with transaction.atomic():
+            favorite = FavRecipe.objects.create(user=request.user,
+                                                recipe=recipe_in_fav)
+            bump_counter(Recipe, recipe_in_fav.id, 'favorites_count', 1)
+            forget_viewer(request.user.id, 'fav_u')
         serializer = self.get_serializer(favorite)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -126,6 +206,12 @@ class FavView(generics.CreateAPIView, generics.DestroyAPIView):
                 code=status.HTTP_400_BAD_REQUEST
             )
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+        bump_counter(Recipe, instance.recipe_id, 'favorites_count', -1)
+        forget_viewer(instance.user_id, 'fav_u')
+
 
 class BasketView(generics.CreateAPIView, generics.DestroyAPIView):
     permission_classes = [IsAuthenticated]
@@ -141,8 +227,11 @@ class BasketView(generics.CreateAPIView, generics.DestroyAPIView):
                 {"detail": "Рецепт уже в списке покупок."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        user_basket = Basket.objects.create(user=request.user,
-                                            recipe=recipe_in_basket)
+        with transaction.atomic():
+            user_basket = Basket.objects.create(user=request.user,
+                                                recipe=recipe_in_basket)
+            shopping_list.add_recipe([request.user.id], recipe_in_basket)
+            forget_viewer(request.user.id, 'basket_u')
         user_basket = self.get_serializer(user_basket)
         return Response(user_basket.data, status=status.HTTP_201_CREATED)
 
@@ -158,33 +247,95 @@ class BasketView(generics.CreateAPIView, generics.DestroyAPIView):
                 code=status.HTTP_400_BAD_REQUEST
             )
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+        forget_viewer(instance.user_id, 'basket_u')
+
+
+class Echo:
+    def write(self, value):
+        return value
+
 
 class BasketDownload(APIView):
     permission_classes = [IsAuthenticated]
+    chunk_size = 500
+    export_formats = {
+        'txt': 'text/plain; charset=utf-8',
+        'csv': 'text/csv; charset=utf-8',
+        'json': 'application/json',
+    }
+
+    def perform_content_negotiation(self, request, force=False):
+        return super().perform_content_negotiation(request, force=True)
 
     def get(self, request):
-        rtext = ["Выбранные рецепты:\n"]
+        export = request.query_params.get('format', 'txt')
+        if export not in self.export_formats:
+            return Response(
+                {"detail": "Доступные форматы: "
+                           f"{', '.join(self.export_formats)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         basket_recipes, basket_ingredients = (
             self.get_basket_data(request.user))
-        for i in basket_recipes:
-            rtext.append(i.name)
-        rtext.append("-" * 50)
-        rtext.append("\nНеобходимые продукты:\n")
-        for i in basket_ingredients:
-            rtext.append(f"{i['ingredient__name']}: {i['amount']} "
-                         f"{i['ingredient__measurement_unit']}"
-                         )
-        response = HttpResponse("\n".join(rtext), content_type="text/plain")
-        response["Content-Disposition"] = 'attachment; filename="shopping-list.txt"'
+        rows = getattr(self, f'render_{export}')(
+            basket_recipes.iterator(chunk_size=self.chunk_size),
+            basket_ingredients.iterator(chunk_size=self.chunk_size),
+        )
+        response = StreamingHttpResponse(
+            rows, content_type=self.export_formats[export]
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="shopping-list.{export}"'
+        )
         return response
 
+    def render_txt(self, basket_recipes, basket_ingredients):
+        yield "Выбранные рецепты:\n\n"
+        for name in basket_recipes:
+            yield f"{name}\n"
+        yield "-" * 50 + "\n"
+        yield "\nНеобходимые продукты:\n\n"
+        for i in basket_ingredients:
+            yield (f"{i['ingredient__name']}: {i['amount']} "
+                   f"{i['ingredient__measurement_unit']}\n")
+
+    def render_csv(self, basket_recipes, basket_ingredients):
+        writer = csv.writer(Echo())
+        yield writer.writerow(['type', 'name', 'amount', 'measurement_unit'])
+        for name in basket_recipes:
+            yield writer.writerow(['recipe', name, '', ''])
+        for i in basket_ingredients:
+            yield writer.writerow([
+                'ingredient', i['ingredient__name'], i['amount'],
+                i['ingredient__measurement_unit']
+            ])
+
+    def render_json(self, basket_recipes, basket_ingredients):
+        yield '{"recipes": ['
+        for n, name in enumerate(basket_recipes):
+            yield (', ' if n else '') + json.dumps(name, ensure_ascii=False)
+        yield '], "ingredients": ['
+        for n, i in enumerate(basket_ingredients):
+            yield (', ' if n else '') + json.dumps({
+                'name': i['ingredient__name'],
+                'amount': i['amount'],
+                'measurement_unit': i['ingredient__measurement_unit'],
+            }, ensure_ascii=False)
+        yield ']}'
+
     def get_basket_data(self, user):
-        recipes_query = user.basket_u.all().order_by('recipe__name')
-        basket_recipes = [i.recipe for i in recipes_query]
+        basket_recipes = (
+            Recipe.objects.filter(basket_r__user=user)
+            .order_by('name')
+            .values_list('name', flat=True)
+        )
         basket_ingredients = (
-            IRLinkModel.objects.filter(recipe__in=basket_recipes)
-            .values("ingredient__name", "ingredient__measurement_unit")
-            .annotate(amount=Sum("amount"))
+            BasketIngredient.objects.filter(user=user)
+            .values("ingredient__name", "ingredient__measurement_unit",
+                    amount=F("total_amount"))
+            .order_by("ingredient__name")
         )
         return basket_recipes, basket_ingredients
-
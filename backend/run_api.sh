@@ -3,6 +3,27 @@
 python manage.py collectstatic --noinput
 python manage.py makemigrations
 python manage.py migrate
-python manage.py loaddata fixtures/ingredients.json
+python manage.py import_ingredients fixtures/ingredients.json
 
-gunicorn --bind 0.0.0.0:8000 backend.wsgi
\ No newline at end of file
+rotate_log() {
+    [ -f "$1" ] && [ "$(wc -c < "$1")" -gt "${LOG_MAX_BYTES:-10485760}" ] \
+        || return 0
+    for i in 4 3 2 1; do
+        [ -f "$1.$i" ] && mv "$1.$i" "$1.$((i + 1))"
+    done
+    mv "$1" "$1.1"
+}
+
+while true; do
+    python manage.py purge_revoked_tokens
+    rotate_log "${SLOW_QUERY_LOG:-slow_queries.log}"
+    sleep "${PURGE_TOKENS_INTERVAL:-3600}"
+done &
+
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/metrics}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+gunicorn --bind 0.0.0.0:8000 --worker-class gthread \
+    --workers "${GUNICORN_WORKERS:-2}" --threads "${GUNICORN_THREADS:-4}" \
+    backend.wsgi
\ No newline at end of file
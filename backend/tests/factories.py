@@ -0,0 +1,27 @@
+import base64
+from io import BytesIO
+
+from PIL import Image
+
+from recipes.benchmarking import (PASSWORD, build_world, make_baskets,
+                                  make_favorites, make_follows,
+                                  make_ingredients, make_recipes, make_users)
+
+__all__ = [
+    'PASSWORD', 'build_world', 'make_baskets', 'make_favorites',
+    'make_follows', 'make_ingredients', 'make_recipes', 'make_users',
+    'LOCMEM_CACHES', 'sample_image',
+]
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+
+def sample_image():
+    content = BytesIO()
+    Image.new('RGB', (8, 8), 'white').save(content, 'PNG')
+    return ('data:image/png;base64,'
+            + base64.b64encode(content.getvalue()).decode())
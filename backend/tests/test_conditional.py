@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from rest_framework_simplejwt.tokens import AccessToken
+
+from recipes.catalog import IngredientCatalog
+from tests import factories
+
+
+@override_settings(CACHES=factories.LOCMEM_CACHES)
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        IngredientCatalog.bump_version()
+        self.viewer, self.author = factories.make_users(2)
+        self.ingredient, = factories.make_ingredients(1)
+        self.recipes = factories.make_recipes(
+            [self.author], [self.ingredient], per_author=3
+        )
+        token = AccessToken.for_user(self.viewer)
+        self.clients = {
+            'anonymous': Client(),
+            'viewer': Client(HTTP_AUTHORIZATION=f'Token {token}'),
+        }
+        self.paths = [
+            '/api/recipes/?limit=2',
+            '/api/recipes/?limit=2&pagination=cursor',
+            f'/api/recipes/{self.recipes[0].id}/',
+            '/api/ingredients/',
+            f'/api/users/{self.author.id}/',
+        ]
+
+    def test_not_modified_runs_no_serializer(self):
+        for name, client in self.clients.items():
+            for path in self.paths:
+                with self.subTest(client=name, path=path):
+                    etag = client.get(path)['ETag']
+                    with mock.patch.object(
+                        serializers.Serializer, 'to_representation',
+                        side_effect=AssertionError('сериализация на 304'),
+                    ):
+                        response = client.get(path, HTTP_IF_NONE_MATCH=etag)
+                    self.assertEqual(response.status_code, 304)
+
+    def test_cursor_mode_validators_skip_count(self):
+        client = self.clients['viewer']
+        with CaptureQueriesContext(connection) as queries:
+            client.get('/api/recipes/?limit=1&pagination=cursor')
+        self.assertFalse([
+            q for q in queries.captured_queries
+            if 'COUNT(' in q['sql'] and 'FROM "recipes_recipe"' in q['sql']
+        ])
+
+    def test_ingredient_rename_changes_recipe_etags(self):
+        paths = self.paths[:3]
+        for name, client in self.clients.items():
+            etags = {path: client.get(path)['ETag'] for path in paths}
+            with self.captureOnCommitCallbacks(execute=True):
+                self.ingredient.name = f'{self.ingredient.name} {name}'
+                self.ingredient.save()
+            for path in paths:
+                with self.subTest(client=name, path=path):
+                    response = client.get(
+                        path, HTTP_IF_NONE_MATCH=etags[path]
+                    )
+                    self.assertEqual(response.status_code, 200)
+                    self.assertIn(self.ingredient.name,
+                                  response.content.decode())
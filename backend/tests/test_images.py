@@ -0,0 +1,57 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from backend.constants import RECIPE_IMAGE_VARIANTS
+from backend.images import build_variants, executor
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TransactionTestCase, override_settings
+from PIL import Image
+
+from recipes.models import Recipe
+from tests import factories
+
+
+def png(color):
+    content = BytesIO()
+    Image.new('RGB', (64, 64), color).save(content, 'PNG')
+    return ContentFile(content.getvalue())
+
+
+class ImageVariantTests(TransactionTestCase):
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings = override_settings(
+            MEDIA_ROOT=media, CACHES=factories.LOCMEM_CACHES
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        author, = factories.make_users(1)
+        self.recipe, = factories.make_recipes(
+            [author], factories.make_ingredients(1)
+        )
+
+    def replace_image(self, color):
+        name = default_storage.save('recipes/image.png', png(color))
+        Recipe.objects.filter(pk=self.recipe.pk).update(image=name)
+        return executor.submit(
+            build_variants, 'recipes.Recipe', self.recipe.pk, 'image',
+            name, RECIPE_IMAGE_VARIANTS,
+        ).result()
+
+    def files(self, variants):
+        return [path for name, path in variants.items() if name != 'source']
+
+    def test_replaced_and_deleted_variants_are_removed(self):
+        first = self.replace_image('red')
+        second = self.replace_image('blue')
+        for path in self.files(first):
+            self.assertFalse(default_storage.exists(path), path)
+        for path in self.files(second):
+            self.assertTrue(default_storage.exists(path), path)
+        Recipe.objects.get(pk=self.recipe.pk).delete()
+        for path in self.files(second):
+            self.assertFalse(default_storage.exists(path), path)
@@ -0,0 +1,63 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from recipes.models import Basket, FavRecipe
+from tests import factories
+
+
+@skipUnless(connection.vendor == 'postgresql', 'EXPLAIN для PostgreSQL')
+@override_settings(CACHES=factories.LOCMEM_CACHES)
+class IndexUsageTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        authors = factories.make_users(50, prefix='author')
+        ingredient, = factories.make_ingredients(1)
+        cls.author, cls.user = authors[:2]
+        recipes = factories.make_recipes(
+            authors, [ingredient], per_author=200
+        )
+        FavRecipe.objects.bulk_create([
+            FavRecipe(user=user, recipe=recipe)
+            for user in authors
+            for recipe in recipes[::50]
+        ])
+        Basket.objects.bulk_create([
+            Basket(user=user, recipe=recipe)
+            for user in authors
+            for recipe in recipes[25::50]
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def plan(self, path):
+        token = AccessToken.for_user(self.user)
+        client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(client.get(path).status_code, 200)
+        sql, = [
+            q['sql'] for q in queries
+            if q['sql'].startswith('SELECT "recipes_recipe"."id"')
+            and q['sql'].endswith(' LIMIT 6')
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN {sql}')
+            return '\n'.join(row[0] for row in cursor.fetchall())
+
+    def test_author_filter_uses_author_index(self):
+        plan = self.plan(f'/api/recipes/?limit=6&author={self.author.id}')
+        self.assertIn('using recipe_author_id ', plan)
+
+    def test_flag_filters_use_unique_indexes(self):
+        for path, index in (
+            ('/api/recipes/?limit=6&is_favorited=1', 'fav_r'),
+            ('/api/recipes/?limit=6&is_favorited=0', 'fav_r'),
+            ('/api/recipes/?limit=6&is_in_shopping_cart=1', 'basket'),
+            ('/api/recipes/?limit=6&is_in_shopping_cart=0', 'basket'),
+        ):
+            with self.subTest(path=path):
+                self.assertIn(f'using {index} ', self.plan(path))
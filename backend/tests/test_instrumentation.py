@@ -0,0 +1,98 @@
+import marshal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from prometheus_client import REGISTRY
+from rest_framework import serializers
+from rest_framework_simplejwt.tokens import AccessToken
+
+from monitoring.models import RequestProfile
+from tests import factories
+
+
+@override_settings(CACHES=factories.LOCMEM_CACHES)
+class SerializerInstrumentationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.staff, author = factories.make_users(2)
+        self.staff.is_staff = True
+        self.staff.save(update_fields=['is_staff'])
+        self.recipe, = factories.make_recipes(
+            [author], factories.make_ingredients(1)
+        )
+        factories.make_baskets(self.staff, [self.recipe])
+        self.path = f'/api/recipes/{self.recipe.id}/'
+
+    def test_drf_serializers_are_not_patched(self):
+        for cls in (serializers.Serializer, serializers.ListSerializer):
+            with self.subTest(cls=cls.__name__):
+                self.assertEqual(cls.data.fget.__module__,
+                                 'rest_framework.serializers')
+                self.assertEqual(cls.to_representation.__module__,
+                                 'rest_framework.serializers')
+
+    def test_metrics_time_serializers(self):
+        labels = {'view': 'RecipeView', 'method': 'GET'}
+        name = 'foodgram_serializer_seconds_sum'
+        before = REGISTRY.get_sample_value(name, labels) or 0
+        self.assertEqual(Client().get(self.path).status_code, 200)
+        self.assertGreater(REGISTRY.get_sample_value(name, labels), before)
+
+    def test_metrics_cover_streamed_body(self):
+        labels = {'view': 'BasketDownload', 'method': 'GET'}
+
+        def observed():
+            return (
+                REGISTRY.get_sample_value(
+                    'foodgram_request_seconds_count',
+                    labels | {'status': '200'},
+                ) or 0,
+                REGISTRY.get_sample_value(
+                    'foodgram_db_queries_sum', labels
+                ) or 0,
+            )
+
+        token = AccessToken.for_user(self.staff)
+        client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+        requests, queries = observed()
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get('/api/recipes/download_shopping_cart/')
+            self.assertTrue(response.streaming)
+            self.assertEqual(observed(), (requests, queries))
+            b''.join(response.streaming_content)
+        self.assertEqual(observed(), (requests + 1, queries + len(captured)))
+
+    def test_profile_times_serializer_fields(self):
+        token = AccessToken.for_user(self.staff)
+        response = Client(HTTP_AUTHORIZATION=f'Token {token}').get(
+            self.path, HTTP_X_PROFILE='1'
+        )
+        profile = RequestProfile.objects.get(id=response['X-Profile-Id'])
+        fields = {
+            field['field']: field['calls']
+            for field in profile.serializer_fields
+        }
+        self.assertEqual(fields['GetRecipeSerializer.name'], 1)
+        self.assertEqual(fields['GetUserSerializer.username'], 1)
+        self.assertEqual(fields['IRLinkSerializer.amount'], 1)
+        self.assertNotIn('NewRecipeSerializer.image', fields)
+
+    def test_profile_covers_streamed_body(self):
+        token = AccessToken.for_user(self.staff)
+        response = Client(HTTP_AUTHORIZATION=f'Token {token}').get(
+            '/api/recipes/download_shopping_cart/', HTTP_X_PROFILE='1'
+        )
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn(self.recipe.name, content)
+        profile = RequestProfile.objects.get(id=response['X-Profile-Id'])
+        tables = ' '.join(query['sql'] for query in profile.queries)
+        self.assertIn('"recipes_basket"', tables)
+        self.assertIn('"recipes_basketingredient"', tables)
+        self.assertEqual(profile.query_count, len(profile.queries))
+        self.assertGreater(profile.duration_ms, 0)
+        functions = marshal.loads(bytes(profile.stats))
+        self.assertIn('render_txt', [name for _, _, name in functions])
@@ -0,0 +1,113 @@
+import json
+from collections import Counter
+
+from backend.queries import fingerprint
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tests import factories
+
+
+def recipe_payload(world):
+    return {
+        'name': 'Новый рецепт',
+        'text': 'Описание',
+        'cooking_time': 10,
+        'image': factories.sample_image(),
+        'ingredients': [
+            {'id': i.id, 'amount': 5} for i in world['ingredients']
+        ],
+    }
+
+
+ROUTES = (
+    ('GET', '/api/recipes/?limit={n}', 200, None),
+    ('GET', '/api/recipes/?limit={n}&is_favorited=1'
+            '&is_in_shopping_cart=1', 200, None),
+    ('GET', '/api/recipes/?limit={n}&is_favorited=0', 200, None),
+    ('GET', '/api/recipes/?limit={n}&pagination=cursor', 200, None),
+    ('POST', '/api/recipes/', 201, recipe_payload),
+    ('GET', '/api/recipes/{own}/', 200, None),
+    ('PATCH', '/api/recipes/{own}/', 200, recipe_payload),
+    ('DELETE', '/api/recipes/{own}/', 204, None),
+    ('GET', '/api/recipes/{recipe}/get-link/', 200, None),
+    ('POST', '/api/recipes/{own}/favorite/', 201, None),
+    ('DELETE', '/api/recipes/{recipe}/favorite/', 204, None),
+    ('POST', '/api/recipes/{own}/shopping_cart/', 201, None),
+    ('DELETE', '/api/recipes/{recipe}/shopping_cart/', 204, None),
+    ('GET', '/api/recipes/download_shopping_cart/', 200, None),
+    ('GET', '/api/recipes/download_shopping_cart/?format=json', 200, None),
+    ('GET', '/api/ingredients/', 200, None),
+    ('GET', '/api/ingredients/?name=ingredient', 200, None),
+    ('GET', '/api/ingredients/{ingredient}/', 200, None),
+    ('GET', '/api/users/?limit={n}', 200, None),
+    ('POST', '/api/users/', 201, lambda world: {
+        'email': 'new@example.com', 'username': 'new',
+        'first_name': 'Имя', 'last_name': 'Фамилия',
+        'password': factories.PASSWORD,
+    }),
+    ('GET', '/api/users/{author}/', 200, None),
+    ('GET', '/api/users/me/', 200, None),
+    ('PUT', '/api/users/me/avatar/', 200, lambda world: {
+        'avatar': factories.sample_image(),
+    }),
+    ('DELETE', '/api/users/me/avatar/', 204, None),
+    ('POST', '/api/users/set_password/', 204, lambda world: {
+        'new_password': factories.PASSWORD + '!',
+        'current_password': factories.PASSWORD,
+    }),
+    ('GET', '/api/users/subscriptions/?limit={n}&recipes_limit=3', 200, None),
+    ('POST', '/api/users/{prolific}/subscribe/', 201, None),
+    ('DELETE', '/api/users/{author}/subscribe/', 204, None),
+    ('POST', '/api/auth/token/login/', 200, lambda world: {
+        'email': world['viewer'].email, 'password': factories.PASSWORD,
+    }),
+    ('POST', '/api/auth/token/logout/', 204, None),
+)
+
+
+@override_settings(CACHES=factories.LOCMEM_CACHES)
+class QueryCountTests(TestCase):
+    small = 1
+    large = 100
+
+    def measure(self, n):
+        cache.clear()
+        results = []
+        with transaction.atomic():
+            world = factories.build_world(n)
+            token = str(AccessToken.for_user(world['viewer']))
+            client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+            for method, path, _, payload in ROUTES:
+                path = path.format(**world)
+                data = payload(world) if payload else None
+                with transaction.atomic():
+                    with CaptureQueriesContext(connection) as queries:
+                        response = client.generic(
+                            method, path,
+                            json.dumps(data) if data else '',
+                            content_type='application/json',
+                        )
+                        if response.streaming:
+                            b''.join(response.streaming_content)
+                    transaction.set_rollback(True)
+                results.append((
+                    response.status_code,
+                    [q['sql'] for q in queries.captured_queries],
+                ))
+            transaction.set_rollback(True)
+        return results
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        runs = [self.measure(self.small), self.measure(self.large)]
+        for route, (status_s, sql_s), (status_l, sql_l) in zip(
+                ROUTES, *runs):
+            with self.subTest(route=f'{route[0]} {route[1]}'):
+                self.assertEqual(status_s, route[2])
+                self.assertEqual(status_l, route[2])
+                grew = (Counter(map(fingerprint, sql_l))
+                        - Counter(map(fingerprint, sql_s)))
+                self.assertLessEqual(len(sql_l), len(sql_s), dict(grew))
@@ -0,0 +1,100 @@
+import json
+from contextlib import ExitStack
+from unittest import skipUnless
+
+from backend.routers import REPLICAS, pin_key
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tests import factories
+
+ROUTED_TABLES = tuple(f'"{app}_' for app in settings.REPLICA_APPS)
+
+
+@skipUnless(REPLICAS, 'Реплики не настроены, задайте PG_REPLICA_HOSTS.')
+@override_settings(CACHES=factories.LOCMEM_CACHES, REPLICA_PIN_SECONDS=60)
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {DEFAULT_DB_ALIAS, *REPLICAS}
+
+    def setUp(self):
+        cache.clear()
+        self.viewer, self.author = factories.make_users(2, prefix='replica')
+        self.recipe, = factories.make_recipes(
+            [self.author], factories.make_ingredients(1)
+        )
+        token = AccessToken.for_user(self.viewer)
+        self.client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+
+    def routed(self, method, path, data=None, client=None):
+        with ExitStack() as stack:
+            queries = {
+                alias: stack.enter_context(
+                    CaptureQueriesContext(connections[alias])
+                )
+                for alias in [DEFAULT_DB_ALIAS, *REPLICAS]
+            }
+            response = (client or self.client).generic(
+                method, path, json.dumps(data) if data else '',
+                content_type='application/json',
+            )
+        counts = {
+            alias: sum(
+                any(table in q['sql'] for table in ROUTED_TABLES)
+                for q in captured.captured_queries
+            )
+            for alias, captured in queries.items()
+        }
+        primary = counts.pop(DEFAULT_DB_ALIAS)
+        return response, primary, sum(counts.values())
+
+    def assertOnReplica(self, method, path):
+        response, primary, replica = self.routed(method, path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+        return response
+
+    def assertOnPrimary(self, method, path, data=None, client=None):
+        response, primary, replica = self.routed(method, path, data, client)
+        self.assertLess(response.status_code, 400)
+        self.assertEqual(replica, 0)
+        self.assertGreater(primary, 0)
+        return response
+
+    def test_safe_reads_use_replica(self):
+        self.assertOnReplica('GET', '/api/recipes/')
+        self.assertOnReplica('GET', f'/api/users/{self.author.id}/')
+
+    def test_write_pins_user_to_primary(self):
+        self.assertOnPrimary(
+            'POST', f'/api/recipes/{self.recipe.id}/favorite/'
+        )
+        response = self.assertOnPrimary('GET', '/api/recipes/?is_favorited=1')
+        self.assertEqual(
+            [r['id'] for r in response.json()['results']], [self.recipe.id]
+        )
+        cache.delete(pin_key(self.viewer.id))
+        self.assertOnReplica('GET', '/api/recipes/')
+
+    def test_signup_and_login_pin_user_to_primary(self):
+        anonymous = Client()
+        response = self.assertOnPrimary('POST', '/api/users/', {
+            'email': 'new@example.com', 'username': 'new',
+            'first_name': 'Имя', 'last_name': 'Фамилия',
+            'password': factories.PASSWORD,
+        }, anonymous)
+        user_id = response.json()['id']
+        self.assertTrue(cache.get(pin_key(user_id)))
+        cache.delete(pin_key(user_id))
+        response = self.assertOnPrimary('POST', '/api/auth/token/login/', {
+            'email': 'new@example.com', 'password': factories.PASSWORD,
+        }, anonymous)
+        self.assertTrue(cache.get(pin_key(user_id)))
+        client = Client(
+            HTTP_AUTHORIZATION=f'Token {response.json()["auth_token"]}'
+        )
+        self.assertOnPrimary('GET', '/api/users/me/', client=client)
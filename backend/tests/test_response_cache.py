@@ -0,0 +1,25 @@
+from django.test import Client, TestCase, override_settings
+
+from tests import factories
+
+
+@override_settings(CACHES=factories.LOCMEM_CACHES,
+                   ALLOWED_HOSTS=['one.example', 'two.example'])
+class ResponseCacheTests(TestCase):
+
+    def setUp(self):
+        author, = factories.make_users(1)
+        factories.make_recipes([author], factories.make_ingredients(1))
+
+    def test_entries_are_not_shared_between_hosts(self):
+        client = Client()
+        first = client.get('/api/recipes/', HTTP_HOST='one.example')
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(
+            client.get('/api/recipes/', HTTP_HOST='one.example')['X-Cache'],
+            'HIT',
+        )
+        second = client.get('/api/recipes/', HTTP_HOST='two.example')
+        self.assertEqual(second['X-Cache'], 'MISS')
+        self.assertIn('//two.example/', second.content.decode())
+        self.assertNotIn('//one.example/', second.content.decode())
@@ -0,0 +1,52 @@
+from django.test import TestCase, override_settings
+
+from recipes import shopping_list
+from recipes.models import Basket, BasketIngredient
+from tests import factories
+
+
+@override_settings(CACHES=factories.LOCMEM_CACHES)
+class ShoppingListTests(TestCase):
+
+    def setUp(self):
+        self.buyer, self.author, self.other = factories.make_users(3)
+        self.ingredients = factories.make_ingredients(2)
+        self.recipe, = factories.make_recipes([self.author], self.ingredients)
+        self.kept, = factories.make_recipes([self.other], self.ingredients)
+        factories.make_baskets(self.buyer, [self.recipe, self.kept])
+
+    def assertListsMatchBaskets(self):
+        expected = {
+            (row['recipe__basket_r__user'], row['ingredient']):
+                (row['total_amount'], row['recipe_count'])
+            for row in shopping_list.expected_rows()
+        }
+        actual = {
+            (row.user_id, row.ingredient_id):
+                (row.total_amount, row.recipe_count)
+            for row in BasketIngredient.objects.all()
+        }
+        self.assertEqual(actual, expected)
+
+    def test_author_deletion_cleans_other_lists(self):
+        self.author.delete()
+        self.assertListsMatchBaskets()
+
+    def test_recipe_deletion_cleans_lists(self):
+        self.recipe.delete()
+        self.assertListsMatchBaskets()
+
+    def test_basket_queryset_deletion_cleans_list(self):
+        Basket.objects.filter(recipe=self.recipe).delete()
+        self.assertListsMatchBaskets()
+        Basket.objects.all().delete()
+        self.assertFalse(BasketIngredient.objects.exists())
+
+    def test_adding_to_existing_rows_accumulates(self):
+        shopping_list.apply_deltas([self.buyer.id], {
+            self.ingredients[0].id: (5, 1),
+        })
+        row = BasketIngredient.objects.get(
+            user=self.buyer, ingredient=self.ingredients[0]
+        )
+        self.assertEqual((row.total_amount, row.recipe_count), (25, 3))
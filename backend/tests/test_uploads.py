@@ -0,0 +1,151 @@
+import base64
+import json
+import os
+import shutil
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+from io import BytesIO
+from unittest import mock
+
+from backend.constants import MAX_IMAGE_SIZE, MB_SIZE
+from backend.fields import StreamingImageField
+from django.test import Client, TestCase, override_settings
+from django.test.client import MULTIPART_CONTENT, encode_multipart
+from PIL import Image
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken
+
+from recipes.catalog import IngredientCatalog
+from tests import factories
+
+BOUNDARY = 'upload-boundary'
+
+
+def noise_png(side=1000):
+    content = BytesIO()
+    Image.frombytes('RGB', (side, side), os.urandom(side * side * 3)).save(
+        content, 'PNG'
+    )
+    content.name = 'noise.png'
+    content.seek(0)
+    return content
+
+
+@contextmanager
+def traced(target, name):
+    original = getattr(target, name)
+    peaks = []
+
+    def measured(*args, **kwargs):
+        tracemalloc.start()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    with mock.patch.object(target, name, measured):
+        yield peaks
+
+
+class UploadMemoryTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Image.init()
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings = override_settings(
+            MEDIA_ROOT=media, CACHES=factories.LOCMEM_CACHES
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        user, = factories.make_users(1)
+        self.ingredient, = factories.make_ingredients(1)
+        IngredientCatalog.bump_version()
+        token = AccessToken.for_user(user)
+        self.client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+        self.image = noise_png().getvalue()
+        self.encoded = ('data:image/png;base64,'
+                        + base64.b64encode(self.image).decode())
+
+    def recipe(self, **extra):
+        return {
+            'name': 'Рецепт',
+            'text': 'Описание',
+            'cooking_time': 10,
+            **extra,
+        }
+
+    def put_multipart(self, path, data):
+        return self.client.put(
+            path, encode_multipart(BOUNDARY, data),
+            content_type=f'multipart/form-data; boundary={BOUNDARY}',
+        )
+
+    def test_base64_upload_is_decoded_in_chunks(self):
+        ingredients = [{'id': self.ingredient.id, 'amount': 5}]
+        uploads = (
+            ('post', '/api/recipes/', 201,
+             self.recipe(image=self.encoded, ingredients=ingredients)),
+            ('put', '/api/users/me/avatar/', 200, {'avatar': self.encoded}),
+        )
+        for method, path, status, data in uploads:
+            with self.subTest(path=path):
+                with traced(StreamingImageField,
+                            'to_internal_value') as peaks:
+                    response = getattr(self.client, method)(
+                        path, json.dumps(data),
+                        content_type='application/json',
+                    )
+                self.assertEqual(response.status_code, status,
+                                 response.content)
+                self.assertLess(max(peaks), len(self.encoded) // 10)
+
+    def test_multipart_upload_is_streamed_to_disk(self):
+        ingredients = json.dumps([{'id': self.ingredient.id, 'amount': 5}])
+        uploads = (
+            ('/api/recipes/', 201, lambda: self.client.post(
+                '/api/recipes/',
+                self.recipe(image=noise_png(), ingredients=ingredients),
+                content_type=MULTIPART_CONTENT,
+            )),
+            ('/api/users/me/avatar/', 200, lambda: self.put_multipart(
+                '/api/users/me/avatar/', {'avatar': noise_png()}
+            )),
+        )
+        for path, status, send in uploads:
+            with self.subTest(path=path):
+                with traced(APIView, 'dispatch') as peaks:
+                    response = send()
+                self.assertEqual(response.status_code, status,
+                                 response.content)
+                self.assertLess(max(peaks), len(self.image) // 10)
+
+    def test_oversized_upload_is_rejected_before_decoding(self):
+        size = MAX_IMAGE_SIZE * MB_SIZE + MB_SIZE
+        encoded = 'data:image/png;base64,' + 'A' * (size // 3 * 4)
+        with traced(StreamingImageField, 'to_internal_value') as peaks, \
+                mock.patch('backend.fields.DecodedUpload') as decoded:
+            response = self.client.put(
+                '/api/users/me/avatar/', json.dumps({'avatar': encoded}),
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(StreamingImageField.too_large_message,
+                      response.json()['avatar'])
+        decoded.assert_not_called()
+        self.assertLess(max(peaks), MB_SIZE)
+
+        oversized = BytesIO(os.urandom(size))
+        oversized.name = 'large.png'
+        response = self.put_multipart(
+            '/api/users/me/avatar/', {'avatar': oversized}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(StreamingImageField.too_large_message,
+                      response.json()['avatar'])
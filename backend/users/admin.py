@@ -9,8 +9,14 @@ class CustomUser(UserAdmin):
         'email',
         'first_name',
         'last_name',
+        'recipes_count',
+        'followers_count',
         'is_staff'
     )
+    fieldsets = UserAdmin.fieldsets + (
+        ('Счётчики', {'fields': ('recipes_count', 'followers_count')}),
+    )
+    readonly_fields = ('recipes_count', 'followers_count')
     search_fields = ('email', 'username')
 
 
@@ -0,0 +1,90 @@
+import json
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.token_blacklist.models import (BlacklistedToken,
+                                                             OutstandingToken)
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.authentication import CachedJWTAuthentication
+from backend.revocation import RevokedTokens, revoked_tokens
+from users.models import User
+
+
+def per_call(function, args):
+    start = time.perf_counter()
+    for arg in args:
+        function(arg)
+    return round((time.perf_counter() - start) / len(args) * 1e6, 2)
+
+
+class Command(BaseCommand):
+    help = ('Измеряет накладные расходы аутентификации при большом числе '
+            'отозванных токенов. Данные откатываются после замера.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tokens', type=int, default=1000000)
+        parser.add_argument('--checks', type=int, default=10000)
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, tokens, checks, batch_size, **options):
+        with transaction.atomic():
+            user = User.objects.create(
+                email='revocation@example.com', username='revocation'
+            )
+            self.revoke(user, tokens, batch_size)
+            RevokedTokens.bump_version(rebuild=True)
+            start = time.perf_counter()
+            bloom = revoked_tokens.refresh()
+            build = time.perf_counter() - start
+
+            revoked = [f'{i:032x}' for i in range(0, tokens,
+                                                  max(1, tokens // checks))]
+            unknown = [f'{i:032x}' for i in range(tokens, tokens + checks)]
+            false_positives = sum(jti in bloom for jti in unknown)
+            header = f'Token {AccessToken.for_user(user)}'
+            request = RequestFactory().get('/', HTTP_AUTHORIZATION=header)
+            auth = CachedJWTAuthentication()
+            auth.authenticate(request)
+            report = {
+                'revoked_tokens': tokens,
+                'filter_bytes': len(bloom.bits),
+                'filter_hashes': bloom.hashes,
+                'filter_build_s': round(build, 3),
+                'false_positive_rate': false_positives / len(unknown),
+                'bloom_check_us': per_call(bloom.__contains__, unknown),
+                'revoked_check_us': per_call(revoked_tokens.is_revoked,
+                                             revoked[:1000]),
+                'db_check_us': per_call(
+                    lambda jti: BlacklistedToken.objects.filter(
+                        token__jti=jti).exists(),
+                    unknown[:1000],
+                ),
+                'token_decode_us': per_call(
+                    JWTAuthentication().get_validated_token,
+                    [auth.get_raw_token(header.encode())] * checks,
+                ),
+                'authenticate_us': per_call(
+                    auth.authenticate, [request] * checks
+                ),
+            }
+            transaction.set_rollback(True)
+        RevokedTokens.bump_version(rebuild=True)
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def revoke(self, user, tokens, batch_size):
+        expires_at = timezone.now() + timedelta(days=10)
+        for start in range(0, tokens, batch_size):
+            outstanding = OutstandingToken.objects.bulk_create([
+                OutstandingToken(user=user, jti=f'{i:032x}', token='',
+                                 expires_at=expires_at)
+                for i in range(start, min(start + batch_size, tokens))
+            ])
+            BlacklistedToken.objects.bulk_create([
+                BlacklistedToken(token=token) for token in outstanding
+            ])
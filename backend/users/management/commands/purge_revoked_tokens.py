@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from backend.revocation import revoked_tokens
+
+
+class Command(BaseCommand):
+    help = 'Удаляет отозванные и выпущенные токены с истёкшим сроком.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, batch_size=10000, **options):
+        purged = revoked_tokens.purge(batch_size)
+        self.stdout.write(f'Удалено токенов: {purged}')
@@ -1,14 +1,21 @@
-from backend.constants import MIN_INT, MAX_INT, MAX_IMAGE_SIZE, MB_SIZE
-from django.contrib.auth import authenticate
+from backend.constants import (MIN_INT, MAX_INT, MAX_IMAGE_SIZE, MB_SIZE,
+                               AVATAR_IMAGE_VARIANTS, RECIPE_IMAGE_VARIANTS)
+from backend.fields import StreamingImageField
+from backend.images import variant_urls
+from backend.serializers import ModelSerializer
+from backend import passwords
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as Dve
+from django.db import transaction
+from django.db.models import Prefetch
+from backend.counters import bump_counter
 from drf_extra_fields.fields import Base64ImageField
 from recipes.models import Recipe
 from rest_framework import serializers
 from .models import User, Follow
 
 
-class NewUserSerializer(serializers.ModelSerializer):
+class NewUserSerializer(ModelSerializer):
 
     class Meta:
         model = User
@@ -21,14 +28,18 @@ class NewUserSerializer(serializers.ModelSerializer):
         ]
 
     def create(self, data):
+        password = passwords.make_password(
+            self.context['request'], data['email'], data['password']
+        )
         try:
-            user = User.objects.create_user(
-                email=data['email'],
-                username=data['username'],
+            user = User(
+                email=User.objects.normalize_email(data['email']),
+                username=User.normalize_username(data['username']),
                 first_name=data['first_name'],
                 last_name=data['last_name'],
-                password=data['password']
+                password=password
             )
+            user.save()
             return user
         except Exception as e:
             raise serializers.ValidationError(str(e))
@@ -63,9 +74,10 @@ class NewUserSerializer(serializers.ModelSerializer):
         }
 
 
-class GetUserSerializer(serializers.ModelSerializer):
+class GetUserSerializer(ModelSerializer):
 
     avatar = Base64ImageField(required=False)
+    avatar_variants = serializers.SerializerMethodField()
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
@@ -77,20 +89,31 @@ class GetUserSerializer(serializers.ModelSerializer):
             'first_name',
             'last_name',
             'is_subscribed',
-            'avatar'
+            'avatar',
+            'avatar_variants',
+            'recipes_count',
+            'followers_count'
         ]
 
+    def get_avatar_variants(self, obj):
+        return variant_urls(self.context.get('request'), obj.avatar,
+                            obj.avatar_variants, AVATAR_IMAGE_VARIANTS)
+
     def get_is_subscribed(self, obj):
         r = self.context.get('request')
-        if (r and r.user.is_authenticated and
-                r.user.follower.filter(following=obj).exists()):
-            return True
-        return False
+        if not (r and r.user.is_authenticated) or self.context.get(
+                'static_card'):
+            return False
+        if 'subscribed_ids' not in self.context:
+            self.context['subscribed_ids'] = set(
+                r.user.follower.values_list('following_id', flat=True)
+            )
+        return obj.id in self.context['subscribed_ids']
 
 
-class AvatarSerializer(serializers.ModelSerializer):
+class AvatarSerializer(ModelSerializer):
 
-    avatar = Base64ImageField(required=True)
+    avatar = StreamingImageField(required=True)
 
     class Meta:
         model = User
@@ -106,7 +129,7 @@ class AvatarSerializer(serializers.ModelSerializer):
         return value
 
 
-class PasswordSerializer(serializers.ModelSerializer):
+class PasswordSerializer(ModelSerializer):
 
     new_password = serializers.CharField(
         style={'input_type': 'password'},
@@ -135,21 +158,25 @@ class PasswordSerializer(serializers.ModelSerializer):
         return value
 
     def validate_current_password(self, value):
-        user = self.context['request'].user
-        if authenticate(username=user.email, password=value):
+        request = self.context['request']
+        if passwords.check_password(request, request.user, value):
             return value
         else:
             raise serializers.ValidationError("Неверный старый пароль.")
 
     def save(self):
-        user = self.context['request'].user
-        user.set_password(self.validated_data['new_password'])
+        request = self.context['request']
+        user = request.user
+        user.password = passwords.make_password(
+            request, user.email, self.validated_data['new_password']
+        )
         user.save()
 
 
-class UserRecipeSerializer(serializers.ModelSerializer):
+class UserRecipeSerializer(ModelSerializer):
 
     image = Base64ImageField(read_only=True)
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
@@ -157,14 +184,18 @@ class UserRecipeSerializer(serializers.ModelSerializer):
             'id',
             'name',
             'image',
+            'image_variants',
             'cooking_time'
         ]
 
+    def get_image_variants(self, obj):
+        return variant_urls(self.context.get('request'), obj.image,
+                            obj.image_variants, RECIPE_IMAGE_VARIANTS)
+
 
 class SubscriptionSerializer(GetUserSerializer):
 
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
 
     class Meta:
         model = User
@@ -176,44 +207,61 @@ class SubscriptionSerializer(GetUserSerializer):
             'last_name',
             'is_subscribed',
             'avatar',
+            'avatar_variants',
             'recipes',
-            'recipes_count'
+            'recipes_count',
+            'followers_count'
         ]
 
     def get_is_subscribed(self, obj):
         return True
 
+    @staticmethod
+    def get_recipes_limit(request):
+        if not request:
+            return None
+        try:
+            r_max = int(request.query_params.get('recipes_limit'))
+        except (TypeError, ValueError):
+            return None
+        return r_max if r_max >= 0 else None
+
+    @classmethod
+    def setup_eager_loading(cls, rows, request):
+        recipes = Recipe.objects.all()
+        r_max = cls.get_recipes_limit(request)
+        if r_max is not None:
+            recipes = recipes[:r_max]
+        return rows.prefetch_related(
+            Prefetch('recipes_of_author', queryset=recipes,
+                     to_attr='shown_recipes')
+        )
+
     def get_recipes(self, obj):
-        request = self.context.get('request')
-        if request:
-            r_max = request.query_params.get('recipes_limit')
-        else:
-            r_max = None
-        rows = obj.recipes_of_author.all()
-        if r_max:
-            try:
-                r_max = int(r_max)
+        rows = getattr(obj, 'shown_recipes', None)
+        if rows is None:
+            rows = obj.recipes_of_author.all()
+            r_max = self.get_recipes_limit(self.context.get('request'))
+            if r_max is not None:
                 rows = rows[:r_max]
-            except ValueError:
-                pass
         serialized = UserRecipeSerializer(
             rows, many=True, context=self.context,
         )
         return serialized.data
 
-    def get_recipes_count(self, obj):
-        return obj.recipes_of_author.count()
-
 
-class SubscribeSerializer(serializers.ModelSerializer):
+class SubscribeSerializer(ModelSerializer):
 
     class Meta:
         model = Follow
         fields = ['following', ]
 
+    @transaction.atomic
     def create(self, data):
         data['follower'] = self.context['request'].user
-        return super().create(data)
+        follow = super().create(data)
+        bump_counter(User, follow.following_id, 'followers_count', 1)
+        return follow
 
     def validate(self, data):
         request = self.context['request']
@@ -234,7 +282,11 @@ class SubscribeSerializer(serializers.ModelSerializer):
         return data
 
     def to_representation(self, instance):
+        following = SubscriptionSerializer.setup_eager_loading(
+            User.objects.filter(pk=instance.following_id),
+            self.context.get('request'),
+        ).get()
         return SubscriptionSerializer(
-            instance.following,
+            following,
             context=self.context,
         ).data
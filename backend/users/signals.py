@@ -0,0 +1,23 @@
+from backend.authentication import forget_user
+from backend.constants import AVATAR_IMAGE_VARIANTS
+from backend.images import discard_variants, schedule_variants
+from backend.response_cache import bump_generation
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_variants(instance, 'avatar', AVATAR_IMAGE_VARIANTS)
+        forget_user(instance.pk)
+        bump_generation(User)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    discard_variants(instance, 'avatar')
+    forget_user(instance.pk)
+    bump_generation(User)
@@ -1,13 +1,18 @@
-from datetime import datetime
+from backend.authentication import forget_user
+from backend.conditional import ConditionalGetMixin, make_etag, viewer_state
+from backend.counters import bump_counter
+from backend.images import delete_variants
+from backend.revocation import revoked_tokens
+from backend.routers import pin_to_primary
+from backend.viewer import forget_viewer
 from django.contrib.auth import authenticate
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import AccessToken
-from rest_framework_simplejwt.token_blacklist.models import (BlacklistedToken,
-                                                             OutstandingToken)
 from .models import User
 from .serializers import (NewUserSerializer, GetUserSerializer,
                           AvatarSerializer, PasswordSerializer,
@@ -22,6 +27,7 @@ class LoginView(generics.GenericAPIView):
         if u and p:
             user = authenticate(request, username=u, password=p)
             if user:
+                pin_to_primary(user.id)
                 token = AccessToken.for_user(user)
                 return Response(
                     {'auth_token': str(token)},
@@ -38,17 +44,9 @@ class LogoutView(generics.GenericAPIView):
 
     def post(self, request):
         try:
-            t = str(request.auth)
-            access_token = AccessToken(token=t)
-            tblack, created = OutstandingToken.objects.get_or_create(
-                token=t,
-                defaults={
-                    'user': request.user,
-                    'jti': access_token['jti'],
-                    'expires_at': datetime.fromtimestamp(access_token['exp']),
-                }
-            )
-            BlacklistedToken.objects.get_or_create(token=tblack)
+            revoked_tokens.revoke(AccessToken(token=str(request.auth)),
+                                  request.user)
+            forget_user(request.user.id)
             return Response(status=status.HTTP_204_NO_CONTENT)
         except TokenError as e:
             return Response(
@@ -74,7 +72,8 @@ class UsersView(UsersList, generics.ListAPIView):
     def post(self, request):
         serialized = self.get_serializer(data=request.data)
         if serialized.is_valid():
-            serialized.save()
+            user = serialized.save()
+            pin_to_primary(user.id)
             return Response(serialized.data, status=status.HTTP_201_CREATED)
         return Response(serialized.errors,
                         status=status.HTTP_400_BAD_REQUEST)
@@ -88,11 +87,21 @@ class UsersView(UsersList, generics.ListAPIView):
         return {'request': self.request}
 
 
-class UserInfoView(UsersList, generics.RetrieveAPIView):
+class UserInfoView(ConditionalGetMixin, UsersList, generics.RetrieveAPIView):
     serializer_class = GetUserSerializer
     lookup_field = 'id'
     lookup_url_kwarg = 'user_id'
 
+    def get_validators(self, request, *args, **kwargs):
+        updated_at = User.objects.filter(id=kwargs['user_id']).values_list(
+            'updated_at', flat=True
+        ).first()
+        if updated_at is None:
+            return None, None
+        if not request.user.is_authenticated:
+            return make_etag(updated_at), updated_at
+        return make_etag(updated_at, viewer_state(request.user)), None
+
 
 class AvatarView(UsersList, generics.UpdateAPIView, generics.DestroyAPIView):
     permission_classes = [IsAuthenticated]
@@ -109,6 +118,8 @@ class AvatarView(UsersList, generics.UpdateAPIView, generics.DestroyAPIView):
             av_storage.delete(path_to_file)
             user.avatar.delete(save=False)
             user.avatar = None
+            delete_variants(av_storage, user.avatar_variants)
+            user.avatar_variants = {}
             user.save()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -129,7 +140,10 @@ class SubscriptionView(generics.ListAPIView):
     serializer_class = SubscriptionSerializer
 
     def get_queryset(self):
-        return User.objects.filter(following__follower=self.request.user)
+        return SubscriptionSerializer.setup_eager_loading(
+            User.objects.filter(following__follower=self.request.user),
+            self.request,
+        )
 
 
 class SubscribeView(generics.CreateAPIView, generics.DestroyAPIView):
@@ -143,6 +157,7 @@ class SubscribeView(generics.CreateAPIView, generics.DestroyAPIView):
         })
         serialized.is_valid(raise_exception=True)
         serialized.save()
+        forget_viewer(request.user.id, 'follower')
         return Response(serialized.data, status=status.HTTP_201_CREATED)
 
     def delete(self, request, *args, **kwargs):
@@ -150,9 +165,13 @@ class SubscribeView(generics.CreateAPIView, generics.DestroyAPIView):
         f_user = get_object_or_404(
             User, id=f_id,
         )
-        unfollowing, _ = request.user.follower.filter(
-            following=f_user,
-        ).delete()
+        with transaction.atomic():
+            unfollowing, _ = request.user.follower.filter(
+                following=f_user,
+            ).delete()
+            if unfollowing:
+                bump_counter(User, f_user.id, 'followers_count', -1)
+                forget_viewer(request.user.id, 'follower')
         if unfollowing:
             return Response(status=status.HTTP_204_NO_CONTENT)
         else: